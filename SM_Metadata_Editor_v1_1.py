@@ -4,7 +4,6 @@ import platform
 import subprocess
 import pygame
 import traceback
-from collections import defaultdict
 import asyncio
 from shazamio import Shazam
 import nest_asyncio
@@ -13,23 +12,25 @@ import requests
 from io import BytesIO
 import webbrowser
 import csv
+import time
+import bisect
 from io import StringIO
 from PyQt6 import QtCore
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QScrollArea, QFrame, QCheckBox, QTableWidget,
-    QTableWidgetItem, QHeaderView, QStyle, QFileDialog, QMessageBox,
+    QLabel, QLineEdit, QScrollArea, QFrame, QCheckBox, QTableView, QHeaderView, QStyle, QFileDialog, QMessageBox,
     QDialog, QToolButton, QMenu, QGridLayout, QSpacerItem, QSizePolicy,
-    QTextEdit, QGroupBox, QButtonGroup, QRadioButton
+    QTextEdit, QGroupBox, QButtonGroup, QRadioButton, QSpinBox, QProgressBar,
+    QStyledItemDelegate, QStyleOptionButton, QToolTip
+)
+from PyQt6.QtCore import Qt, pyqtSignal, QSize, QTimer, QMetaObject, Q_ARG, QFileSystemWatcher
+from PyQt6.QtGui import QIcon, QFont, QPixmap, QColor, QAction, QPalette, QPainter, QCursor
+from sm_metadata_core import (
+    PARSE_WORKERS, MetadataUtil, SimfileDocument, MetadataCache,
+    SongRecord, SongAssets, LibrarySnapshot, SongScanner, TrigramIndex, SongQuery
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QSize, QTimer, QMetaObject, Q_ARG
-from PyQt6.QtGui import QIcon, QFont, QPixmap, QColor, QAction, QPalette
 
 # Constants
-SUPPORTED_EXTENSIONS = {'.sm', '.ssc'}
-SUPPORTED_AUDIO = {'.ogg', '.mp3', '.wav'}
-METADATA_FIELDS = ['TITLE', 'SUBTITLE', 'ARTIST', 'GENRE', 'MUSIC']
-SUPPORTED_ENCODINGS = ['utf-8-sig', 'utf-8', 'shift-jis', 'latin1', 'cp1252']
 COLUMN_WIDTHS = {
     'checkbox': 30,
     'actions': 130,
@@ -41,8 +42,13 @@ COLUMN_WIDTHS = {
     'genre': 250,
     'status': 30,
     'commit': 80,
-    'id': 0
+    'id': 0,
+    'steps_type': 160,
+    'difficulty': 200,
+    'meter': 70,
+    'chart_credit': 200
 }
+SEARCH_DEBOUNCE_MS = 150  # Typing pause before the search runs
 SHAZAM_BUTTON_NORMAL = {
     "text": "Shazam Mode: OFF",
     "style": "QPushButton { background-color: #4a90e2; }"
@@ -55,7 +61,7 @@ MODERN_LIGHT_STYLE = """
     QMainWindow, QDialog {
         background-color: #f0f0f0;
     }
-    QTableWidget {
+    QTableView {
         background-color: white;
         alternate-background-color: #f7f7f7;
         selection-background-color: #0078d7;
@@ -126,7 +132,7 @@ MODERN_RAINBOW_STYLE = """
             stop:0.75 #ffff80,
             stop:1 #ff80ff);
     }
-    QTableWidget {
+    QTableView {
         background-color: rgba(255, 255, 255, 0.9);
         alternate-background-color: rgba(255, 255, 255, 0.8);
         selection-background-color: rgba(0, 120, 215, 0.7);
@@ -191,73 +197,992 @@ MODERN_RAINBOW_STYLE = """
     }
 """
 
-class MetadataUtil:
+class SongScanThread(QtCore.QThread):
+    """Enumerate and parse songs off the GUI thread, emitting the parsed songs in batches"""
+    songs_found = pyqtSignal(list)  # file_info dicts from SongScanner.parse_song_group
+    progress = pyqtSignal(int, int)  # Song folders done, song folders total
+    BATCH_SECONDS = 0.25  # Emit at least this often so the first rows show up quickly
+    BATCH_MAX = 500
+    
+    def __init__(self, pack_dirs, workers=PARSE_WORKERS, snapshot=None, parent=None):
+        super().__init__(parent)
+        self.pack_dirs = list(pack_dirs)
+        self.workers = workers
+        self.snapshot = snapshot or LibrarySnapshot()
+        
+    def run(self):
+        # Numbering song folders only lists the pack folders, so progress is known up front. A parsed
+        # song marks its folder and every folder enumerated before it as done, including ones
+        # without simfiles, so the bar doesn't lag on packs with empty or non-song folders
+        positions = {}
+        for pack_dir in self.pack_dirs:
+            for song_dir in self.snapshot.subdirs(pack_dir):
+                positions.setdefault(os.path.join(pack_dir, song_dir), len(positions) + 1)
+        total = len(positions)
+        self.progress.emit(0, total)
+        
+        done = 0
+        batch = []
+        last_emit = time.monotonic()
+        songs = SongScanner.scan(self.pack_dirs, self.workers, self.snapshot, index_assets=True)
+        try:
+            for file_info in songs:
+                if self.isInterruptionRequested():
+                    return
+                batch.append(file_info)
+                done = positions.get(file_info['song_dir'], done)
+                    
+                now = time.monotonic()
+                if len(batch) >= self.BATCH_MAX or now - last_emit >= self.BATCH_SECONDS:
+                    self.songs_found.emit(batch)
+                    self.progress.emit(done, total)
+                    batch = []
+                    last_emit = now
+                    
+            if batch:
+                self.songs_found.emit(batch)
+            self.progress.emit(total, total)
+        finally:
+            # Shuts the parser pool down if the scan was interrupted
+            songs.close()
+            
+class ChartScanThread(QtCore.QThread):
+    """Read chart headers off the GUI thread, emitting (entry, charts) pairs in batches"""
+    charts_read = pyqtSignal(list)
+    progress = pyqtSignal(int, int)  # Songs done, songs total
+    BATCH_SECONDS = 0.25
+    BATCH_MAX = 500
+    
+    def __init__(self, entries, workers=PARSE_WORKERS, parent=None):
+        super().__init__(parent)
+        self.entries = list(entries)
+        self.workers = workers
+        
     @staticmethod
-    def read_file_with_encoding(filepath):
-        for encoding in SUPPORTED_ENCODINGS:
+    def read_charts(entry):
+        try:
+            return entry, MetadataUtil.read_charts_cached(entry.filepaths[0])
+        except Exception as e:
+            print(f"Error reading charts for {entry.filepaths[0]}: {str(e)}")
+            return entry, []
+            
+    def run(self):
+        total = len(self.entries)
+        batch = []
+        last_emit = time.monotonic()
+        results = SongScanner.ordered_map(self.read_charts, self.entries, self.workers)
+        try:
+            for done, result in enumerate(results, 1):
+                if self.isInterruptionRequested():
+                    return
+                batch.append(result)
+                now = time.monotonic()
+                if len(batch) >= self.BATCH_MAX or now - last_emit >= self.BATCH_SECONDS:
+                    self.charts_read.emit(batch)
+                    self.progress.emit(done, total)
+                    batch = []
+                    last_emit = now
+                    
+            if batch:
+                self.charts_read.emit(batch)
+        finally:
+            results.close()
+            
+class PackManifestThread(QtCore.QThread):
+    """Revalidate a stored pack manifest against the disk, reporting each changed pack as it is found"""
+    pack_updated = pyqtSignal(str, dict)  # Pack path, manifest entry
+    pack_removed = pyqtSignal(str)  # Pack path
+    
+    def __init__(self, root, manifest, snapshot, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.manifest = dict(manifest)
+        self.snapshot = snapshot
+        self.failed = False  # Set if the check stopped on an error, so its partial result isn't stored
+        
+    def run(self):
+        try:
+            self.revalidate()
+        except Exception as e:
+            self.failed = True
+            print(f"Error checking pack manifest for {self.root}: {str(e)}")
+            traceback.print_exc()
+            
+    def revalidate(self):
+        # Known packs: a changed folder mtime means song folders were added, removed or renamed
+        for pack_dir, entry in self.manifest.items():
+            if self.isInterruptionRequested():
+                return
             try:
-                with open(filepath, 'r', encoding=encoding) as file:
-                    return file.readlines(), encoding
-            except UnicodeDecodeError:
+                mtime_ns = os.stat(pack_dir).st_mtime_ns
+            except OSError:
+                self.pack_removed.emit(pack_dir)
                 continue
-        return None, None
-        
-    @staticmethod
-    def read_metadata(filepath):
-        content, encoding = MetadataUtil.read_file_with_encoding(filepath)
-        if not content:
-            return {}
-            
-        metadata = {}
-        credits = set()
-        
-        for line in content:
-            if line.startswith('#') and ':' in line:
-                key, value = line.strip().split(':', 1)
-                key = key[1:]
-                value = value.rstrip(';')
+            if mtime_ns == entry['mtime_ns']:
+                continue
+            self.snapshot.scan(pack_dir, stop=self.isInterruptionRequested)
+            if self.isInterruptionRequested():
+                return
+            updated = self.snapshot.pack_manifest_entry(pack_dir)
+            if updated['song_count']:
+                self.pack_updated.emit(pack_dir, updated)
+            else:
+                self.pack_removed.emit(pack_dir)
                 
-                if key == 'CREDIT':
-                    credits.add(value)
-                else:
-                    metadata[key] = value
+        if self.isInterruptionRequested():
+            return
+            
+        # New packs: walk the rest of the library without descending into the known ones again
+        self.snapshot.scan(self.root, skip=set(self.manifest), stop=self.isInterruptionRequested)
+        if self.isInterruptionRequested():
+            return
+        for _, pack_dir in sorted(self.snapshot.find_packs(self.root)):
+            if pack_dir not in self.manifest:
+                self.pack_updated.emit(pack_dir, self.snapshot.pack_manifest_entry(pack_dir))
+                
+class SimfileWatcher(QtCore.QObject):
+    """Watch loaded song folders for simfiles changed by other programs
+    
+    Folders and simfiles are handed to QFileSystemWatcher (inotify, kqueue or ReadDirectoryChangesW);
+    any the OS refuses, e.g. past the inotify watch limit, are stat-polled instead. Events are
+    coalesced, then each touched folder's simfiles are stat-diffed so only real changes are reported.
+    """
+    files_changed = pyqtSignal(list)
+    DEBOUNCE_MS = 750
+    POLL_INTERVAL_MS = 5000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.known = {}  # Simfile path -> (size, mtime_ns) when last read or written by us
+        self.dir_files = {}  # Song dir -> simfile paths in it
+        self.polled_dirs = set()
+        self.pending_dirs = set()
+        
+        self.native = QFileSystemWatcher(self)
+        self.native.directoryChanged.connect(self.queue_directory)
+        self.native.fileChanged.connect(lambda path: self.queue_directory(os.path.dirname(path)))
         
-        metadata['CREDITS'] = credits
-        return metadata
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(self.DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.process_pending)
+        
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(self.POLL_INTERVAL_MS)
+        self.poll_timer.timeout.connect(self.poll)
         
     @staticmethod
-    def write_metadata(filepath, metadata):
-        content, encoding = MetadataUtil.read_file_with_encoding(filepath)
-        if not content:
-            return False
+    def stat_key(filepath):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+        
+    def watch(self, filepaths):
+        """Start watching simfiles and their folders, remembering their current stats"""
+        new_dirs = set()
+        new_files = []
+        for filepath in filepaths:
+            if filepath in self.known:
+                continue
+            self.known[filepath] = self.stat_key(filepath)
+            directory = os.path.dirname(filepath)
+            self.dir_files.setdefault(directory, []).append(filepath)
+            new_dirs.add(directory)
+            new_files.append(filepath)
+        if not new_files:
+            return
             
-        # Track if we've found and updated each field
-        updated_fields = {key: False for key in metadata}
-        title_line_index = None
-        
-        # First pass: update existing fields and find TITLE line
-        for i, line in enumerate(content):
-            if line.startswith('#TITLE:'):
-                title_line_index = i
-            for key, value in metadata.items():
-                if line.startswith(f'#{key}:'):
-                    content[i] = f'#{key}:{value};\n'
-                    updated_fields[key] = True
-        
-        # Second pass: add missing fields after TITLE
-        if title_line_index is not None:
-            # Insert missing fields after TITLE in reverse order to maintain order
-            for key, value in reversed(metadata.items()):
-                if not updated_fields[key]:
-                    content.insert(title_line_index + 1, f'#{key}:{value};\n')
-        
+        # Folders catch editors that save by writing a temp file and renaming it over the original,
+        # the files themselves catch in-place writes
+        failed = set(self.native.addPaths(sorted(new_dirs) + new_files))
+        self.polled_dirs.update(
+            directory for directory in new_dirs
+            if directory in failed or any(path in failed for path in self.dir_files[directory])
+        )
+        if self.polled_dirs and not self.poll_timer.isActive():
+            print(f"Watching {len(self.polled_dirs)} song folders by polling")
+            self.poll_timer.start()
+            
+    def clear(self):
+        """Stop watching everything"""
+        watched = self.native.directories() + self.native.files()
+        if watched:
+            self.native.removePaths(watched)
+        self.known.clear()
+        self.dir_files.clear()
+        self.polled_dirs.clear()
+        self.pending_dirs.clear()
+        self.poll_timer.stop()
+        self.debounce_timer.stop()
+        
+    def mark_written(self, filepath):
+        """Record our own write so it isn't reported as an outside change"""
+        if filepath in self.known:
+            self.known[filepath] = self.stat_key(filepath)
+            
+    def queue_directory(self, directory):
+        if directory in self.dir_files:
+            self.pending_dirs.add(directory)
+            self.debounce_timer.start()
+            
+    def diff_directory(self, directory, watched_files=frozenset()):
+        """Get the simfiles in a folder whose stats changed since we last saw them
+        
+        watched_files is the set of files natively watched, needed for folders that aren't polled.
+        """
+        changed = []
+        for filepath in self.dir_files.get(directory, ()):
+            stat_key = self.stat_key(filepath)
+            if stat_key is None or stat_key == self.known[filepath]:
+                continue
+            self.known[filepath] = stat_key
+            changed.append(filepath)
+            # A save by rename replaces the inode, which drops the native watch on the file
+            if directory not in self.polled_dirs and filepath not in watched_files:
+                self.native.addPath(filepath)
+                watched_files.add(filepath)
+        return changed
+        
+    def process_pending(self):
+        directories, self.pending_dirs = self.pending_dirs, set()
+        watched_files = set(self.native.files())  # Copied once, not per changed file
+        changed = [
+            filepath for directory in directories for filepath in self.diff_directory(directory, watched_files)
+        ]
+        if changed:
+            self.files_changed.emit(changed)
+            
+    def poll(self):
+        changed = [filepath for directory in self.polled_dirs for filepath in self.diff_directory(directory)]
+        if changed:
+            self.files_changed.emit(changed)
+
+class SongTableModel(QtCore.QAbstractTableModel):
+    """Table model over the loaded SongRecords, which stay the only copy of each song's values
+
+    Cells are computed from the records when the view asks for them, so only rows on screen cost
+    anything. Status, commit and Shazam state are exposed through roles rather than stored per cell.
+    """
+    entry_edited = pyqtSignal(object, str)  # SongRecord, field changed through setData
+
+    COL_CHECKBOX = 0
+    COL_ACTIONS = 1
+    COL_TYPE = 2
+    COL_PACK = 3
+    COL_TITLE = 4
+    COL_SUBTITLE = 5
+    COL_ARTIST = 6
+    COL_GENRE = 7
+    COL_STATUS = 8
+    COL_COMMIT = 9
+    COL_ID = 10
+
+    # Optional chart columns, hidden until shown from the header context menu
+    CHART_COLUMNS = {
+        11: 'STEPSTYPE',
+        12: 'DIFFICULTY',
+        13: 'METER',
+        14: 'CREDIT'
+    }
+    HEADERS = ['', 'Actions', 'Type', 'Pack', 'Title', 'Subtitle', 'Artist', 'Genre', 'Status', 'Commit', 'ID',
+               'Steps Type', 'Difficulty', 'Meter', 'Chart Credit']
+    FIELD_COLUMNS = {
+        COL_TYPE: 'file_type',
+        COL_PACK: 'pack',
+        COL_TITLE: 'title',
+        COL_SUBTITLE: 'subtitle',
+        COL_ARTIST: 'artist',
+        COL_GENRE: 'genre'
+    }
+    EDITABLE_COLUMNS = {
+        COL_TITLE: 'title',
+        COL_SUBTITLE: 'subtitle',
+        COL_ARTIST: 'artist',
+        COL_GENRE: 'genre'
+    }
+
+    ENTRY_ROLE = Qt.ItemDataRole.UserRole  # The row's SongRecord
+    STATUS_ROLE = Qt.ItemDataRole.UserRole + 1  # '', 'modified', 'conflict' or 'committed'
+    SUGGESTION_ROLE = Qt.ItemDataRole.UserRole + 2  # (current, suggested) Shazam value of a field, or None
+    PLAY_STATE_ROLE = Qt.ItemDataRole.UserRole + 3  # '', 'playing', 'muted' or 'missing'
+    ARTWORK_ROLE = Qt.ItemDataRole.UserRole + 4  # Shazam cover art URL, or None
+
+    STATUS_TEXT = {'': '', 'modified': "⚠", 'conflict': "⚠", 'committed': "✓"}
+    STATUS_COLORS = {'modified': QColor("#FF8C00"), 'conflict': QColor("#D32F2F")}  # Dark orange, red
+    STATUS_TOOLTIPS = {
+        'modified': "Unsaved changes",
+        'conflict': "Unsaved changes - this file was also changed by another program.\n"
+                    "Committing writes your edited fields over the ones on disk.",
+        'committed': "Changes committed"
+    }
+
+    def __init__(self, entries, parent=None):
+        super().__init__(parent)
+        self.entries = entries  # Shared with MetadataEditor.file_entries
+        self.conflicted_ids = set()  # Songs with unsaved edits whose files changed on disk
+        self.committed_ids = set()  # Songs committed since their last edit
+        self.pending = {}  # Entry ID -> set of fields edited but not yet committed
+        self.suggestions = {}  # Entry ID -> {field: (current value, Shazam value)} awaiting a decision
+        self.artwork_urls = {}  # Entry ID -> Shazam cover art URL
+        self.play_states = {}  # Entry ID -> play button state, when not ''
+        self.entries_by_id = {}  # Entry ID -> SongRecord
+        self.rows_by_id = {}  # Entry ID -> source row, kept in step with every reorder of entries
+        self.entries_by_path = {}  # Simfile path -> SongRecord
+        self.sort_keys = {}  # Field -> {SongRecord: collation key}, built on first sort and kept across sorts
+        self.search_index = TrigramIndex()  # Entry ID -> search text, indexed by trigram
+        self.revision = 0  # Bumped whenever an entry's values change, so filter results can be reused until then
+        self.index_rows()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        field = self.EDITABLE_COLUMNS.get(index.column())
+        # A cell showing a Shazam suggestion is clicked to decide on it rather than edited
+        if field and field not in self.suggestions.get(self.entries[index.row()].id, ()):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def is_pending(self, entry):
+        return entry.id in self.pending
+
+    def update_pending(self, entry):
+        """Re-check which of an entry's fields differ from disk after its values or originals changed"""
+        fields = entry.modified_fields()
+        if fields:
+            self.pending[entry.id] = fields
+        else:
+            self.pending.pop(entry.id, None)
+            self.conflicted_ids.discard(entry.id)
+
+    def entry_status(self, entry):
+        if entry.id in self.pending:
+            return 'conflict' if entry.id in self.conflicted_ids else 'modified'
+        return 'committed' if entry.id in self.committed_ids else ''
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole or role == Qt.ItemDataRole.EditRole:
+            field = self.FIELD_COLUMNS.get(col)
+            if field:
+                return entry.get(field)
+            if col == self.COL_STATUS:
+                return self.STATUS_TEXT[self.entry_status(entry)]
+            if col == self.COL_COMMIT:
+                return "Commit" if entry.id in self.pending else ''
+            if col == self.COL_ID:
+                return str(entry.id)
+            if col in self.CHART_COLUMNS:
+                return entry.get_chart_summary(self.CHART_COLUMNS[col])
+            return None
+
+        if role == self.ENTRY_ROLE:
+            return entry
+        if role == self.STATUS_ROLE:
+            return self.entry_status(entry)
+        if role == self.SUGGESTION_ROLE:
+            return self.suggestions.get(entry.id, {}).get(self.EDITABLE_COLUMNS.get(col))
+        if role == self.PLAY_STATE_ROLE:
+            return self.play_states.get(entry.id, '')
+        if role == self.ARTWORK_ROLE:
+            return self.artwork_urls.get(entry.id)
+
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if col == self.COL_STATUS:
+                return self.STATUS_COLORS.get(self.entry_status(entry))
+            if col == self.COL_COMMIT and entry.id in self.pending:
+                return QColor("white")
+            field = self.EDITABLE_COLUMNS.get(col)
+            if field and entry.shazam and entry.shazam.get(field) == entry.get(field) != entry.original(field):
+                return QColor("#FF8C00")  # Accepted Shazam value, not yet committed
+        elif role == Qt.ItemDataRole.BackgroundRole:
+            if col == self.COL_COMMIT and entry.id in self.pending:
+                return QColor("#4a90e2")
+            field = self.EDITABLE_COLUMNS.get(col)
+            if field and entry.shazam and entry.shazam.get(field) == entry.get(field) == entry.original(field):
+                return QColor("#f0fff0")  # Shazam agrees with the file
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            if col == self.COL_STATUS:
+                return self.STATUS_TOOLTIPS.get(self.entry_status(entry))
+            if col == self.COL_COMMIT and entry.id in self.pending:
+                return "Write this song's changes to disk"
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            if col in (self.COL_STATUS, self.COL_COMMIT):
+                return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        field = self.EDITABLE_COLUMNS.get(index.column())
+        if not index.isValid() or not field or role != Qt.ItemDataRole.EditRole:
+            return False
+        entry = self.entries[index.row()]
+        value = str(value)
+        if value == entry.get(field):
+            return False
+
+        entry.set(field, value)
+        self.committed_ids.discard(entry.id)
+        self.update_pending(entry)
+        self.forget_cached_keys(entry)
+        self.emit_row_changed(index.row())
+        self.entry_edited.emit(entry, field)
+        return True
+
+    def index_rows(self, start=0):
+        """Rebuild the ID and path indexes for entries from row start on"""
+        if start == 0:
+            self.entries_by_id = {entry.id: entry for entry in self.entries}
+            self.rows_by_id = {entry.id: row for row, entry in enumerate(self.entries)}
+            self.entries_by_path = {filepath: entry for entry in self.entries for filepath in entry.filepaths}
+            return
+        for row in range(start, len(self.entries)):
+            entry = self.entries[row]
+            self.entries_by_id[entry.id] = entry
+            self.rows_by_id[entry.id] = row
+            for filepath in entry.filepaths:
+                self.entries_by_path[filepath] = entry
+
+    def entry_by_id(self, entry_id):
+        return self.entries_by_id.get(entry_id)
+
+    def entry_by_path(self, filepath):
+        return self.entries_by_path.get(filepath)
+
+    def row_of(self, entry):
+        return self.rows_by_id[entry.id]
+
+    def set_field(self, entry, field, value):
+        """Edit a field as if it were typed into the table"""
+        col = next(col for col, name in self.EDITABLE_COLUMNS.items() if name == field)
+        return self.setData(self.index(self.row_of(entry), col), value)
+
+    def emit_row_changed(self, row):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def refresh_entry(self, entry):
+        """Repaint an entry's row after its record changed outside setData"""
+        self.forget_cached_keys(entry)
+        self.emit_row_changed(self.row_of(entry))
+
+    def refresh_columns(self, columns):
+        """Repaint whole columns, e.g. chart columns after chart headers were read"""
+        if self.entries and columns:
+            self.dataChanged.emit(self.index(0, min(columns)), self.index(len(self.entries) - 1, max(columns)))
+
+    def mark_committed(self, entry):
+        self.committed_ids.add(entry.id)
+        self.update_pending(entry)
+        self.refresh_entry(entry)
+
+    def set_play_state(self, entry, state):
+        if state:
+            self.play_states[entry.id] = state
+        else:
+            self.play_states.pop(entry.id, None)
+        row = self.row_of(entry)
+        self.dataChanged.emit(self.index(row, self.COL_ACTIONS), self.index(row, self.COL_ACTIONS))
+
+    def set_suggestion(self, entry, field, current_value, new_value):
+        self.suggestions.setdefault(entry.id, {})[field] = (current_value, new_value)
+
+    def clear_suggestion(self, entry, field):
+        fields = self.suggestions.get(entry.id)
+        if fields:
+            fields.pop(field, None)
+            if not fields:
+                del self.suggestions[entry.id]
+
+    def append_entries(self, entries):
+        if not entries:
+            return
+        start = len(self.entries)
+        self.beginInsertRows(QtCore.QModelIndex(), start, start + len(entries) - 1)
+        self.entries.extend(entries)
+        self.index_rows(start)
+        for entry in entries:
+            self.search_index.add(entry.id, self.search_text(entry))
+        self.endInsertRows()
+
+    def remove_entries_from(self, first_id):
+        """Drop every entry with an ID of at least first_id, e.g. the rows of a cancelled load"""
+        if not any(entry.id >= first_id for entry in self.entries):
+            return
+        # The rows may have been sorted in among the others, so reset rather than remove ranges
+        self.beginResetModel()
+        for entry in self.entries:
+            if entry.id >= first_id:
+                self.conflicted_ids.discard(entry.id)
+                self.committed_ids.discard(entry.id)
+                self.pending.pop(entry.id, None)
+                self.suggestions.pop(entry.id, None)
+                self.artwork_urls.pop(entry.id, None)
+                self.play_states.pop(entry.id, None)
+                self.search_index.remove(entry.id)
+        self.entries[:] = [entry for entry in self.entries if entry.id < first_id]
+        self.index_rows()
+        self.sort_keys.clear()
+        self.endResetModel()
+
+    def forget_cached_keys(self, entry):
+        """Drop an entry's sort keys and re-index its search text after its values changed"""
+        self.revision += 1
+        for keys in self.sort_keys.values():
+            keys.pop(entry, None)
+        self.search_index.add(entry.id, self.search_text(entry))
+
+    @staticmethod
+    def search_text(entry):
+        """Join and casefold the pack, title, subtitle, artist, genre and credits searched for an entry"""
+        return ' '.join((entry.pack, entry.title, entry.subtitle, entry.artist, entry.genre) + entry.credits).casefold()
+
+    def haystack(self, entry):
+        return self.search_index.texts[entry.id]
+
+    def search_rows(self, text):
+        """Get the source rows, in order, of entries whose search text contains text"""
+        return self.rows_of_ids(self.search_index.search(text))
+        
+    def rows_of_ids(self, entry_ids):
+        """Get the source rows, in order, of the given entry IDs"""
+        rows_by_id = self.rows_by_id
+        return sorted(rows_by_id[entry_id] for entry_id in entry_ids)
+
+    def sort_key_getter(self, field):
+        """Get a key function returning the cached collation key of an entry's field"""
+        keys = self.sort_keys.setdefault(field, {})
+        if len(keys) < len(self.entries):
+            # Fill in keys for new and edited entries only
+            for entry in self.entries:
+                if entry not in keys:
+                    keys[entry] = SongRecord.collation_key(entry.get(field))
+        return keys.__getitem__
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_by([(column, order)])
+
+    def sort_by(self, sort_columns):
+        """Reorder the entries themselves by (column, order) pairs, most significant first
+        
+        Python's sort is stable, so sorting by each column from least to most significant
+        leaves ties of a column in the order of the columns after it.
+        """
+        sort_columns = [(col, order) for col, order in sort_columns if col in self.FIELD_COLUMNS]
+        if not sort_columns:
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        persistent_entries = [self.entries[index.row()] for index in persistent]
+        
+        for column, order in reversed(sort_columns):
+            self.entries.sort(key=self.sort_key_getter(self.FIELD_COLUMNS[column]),
+                              reverse=order == Qt.SortOrder.DescendingOrder)
+        
+        self.rows_by_id = {entry.id: row for row, entry in enumerate(self.entries)}
+        self.changePersistentIndexList(persistent, [
+            self.index(self.rows_by_id[entry.id], index.column())
+            for index, entry in zip(persistent, persistent_entries)
+        ])
+        self.layoutChanged.emit()
+
+    def clear(self):
+        self.beginResetModel()
+        self.entries.clear()
+        self.entries_by_id.clear()
+        self.rows_by_id.clear()
+        self.entries_by_path.clear()
+        self.sort_keys.clear()
+        self.search_index = TrigramIndex()
+        self.conflicted_ids.clear()
+        self.committed_ids.clear()
+        self.pending.clear()
+        self.suggestions.clear()
+        self.artwork_urls.clear()
+        self.play_states.clear()
+        self.endResetModel()
+
+class SongFilterProxyModel(QtCore.QAbstractProxyModel):
+    """Show the SongTableModel rows, in source order, whose SongRecords pass a predicate
+    
+    Rows are only re-filtered when asked, so an edited row doesn't disappear mid-edit.
+    """
+
+    filter_finished = pyqtSignal()  # A filter started with start_filter has been applied
+    FILTER_CHUNK_ROWS = 20000  # Rows tested between events by start_filter
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.predicate = None
+        self.modified_only = False
+        self.source_rows = []  # Proxy row -> source row, ascending
+        self.layout_entries = None  # Entries of the persistent indexes while the source re-sorts
+        self.running_filter = None  # (predicate, pass generator) of a start_filter pass in progress
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setInterval(0)
+        self.filter_timer.timeout.connect(self.continue_filter)
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.dataChanged.connect(self.on_source_data_changed)
+        model.rowsInserted.connect(self.on_source_rows_inserted)
+        model.rowsAboutToBeRemoved.connect(self.beginResetModel)
+        model.rowsRemoved.connect(self.on_source_reset)
+        model.layoutAboutToBeChanged.connect(self.on_source_layout_about_to_change)
+        model.layoutChanged.connect(self.on_source_layout_changed)
+        model.modelAboutToBeReset.connect(self.beginResetModel)
+        model.modelReset.connect(self.on_source_reset)
+        self.source_rows = self.filter_rows()
+
+    def filter_rows(self, rows=None):
+        """Get the source rows (default all) that pass the current filter, in order"""
+        if rows is None:
+            rows = range(len(self.sourceModel().entries))
+        return self.rows_matching(rows, self.predicate)
+
+    def rows_matching(self, rows, predicate):
+        model = self.sourceModel()
+        entries = model.entries
+        if self.modified_only:
+            pending = model.pending
+            rows = [row for row in rows if entries[row].id in pending]
+        if predicate is not None:
+            rows = [row for row in rows if predicate(entries[row])]
+        return list(rows)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def set_filter(self, predicate):
+        """Show only entries for which predicate(entry) is true, or every entry for None"""
+        self.cancel_filter()
+        self.predicate = predicate
+        self.refilter()
+
+    def start_filter(self, predicate, rows=None):
+        """Apply a filter in chunks between events, emitting filter_finished once it is shown
+        
+        Only the given source rows (default all) are tested, so they must include every row
+        predicate can match. Starting another filter cancels this one.
+        """
+        self.cancel_filter()
+        if rows is None:
+            rows = range(len(self.sourceModel().entries))
+        self.running_filter = (predicate, self.filter_pass(predicate, rows))
+        # Small libraries finish in the first chunk, without waiting for the event loop
+        self.continue_filter()
+
+    def filter_pass(self, predicate, rows):
+        matches = []
+        for start in range(0, len(rows), self.FILTER_CHUNK_ROWS):
+            if start:
+                yield  # Let events in between chunks
+            matches.extend(self.rows_matching(rows[start:start + self.FILTER_CHUNK_ROWS], predicate))
+        return matches
+
+    def continue_filter(self):
+        predicate, filter_pass = self.running_filter
         try:
-            with open(filepath, 'w', encoding=encoding) as file:
-                file.writelines(content)
-            return True
-        except Exception:
+            next(filter_pass)
+        except StopIteration as done:
+            self.cancel_filter()
+            self.predicate = predicate
+            self.apply_rows(done.value)
+            self.filter_finished.emit()
+            return
+        self.filter_timer.start()
+
+    def cancel_filter(self):
+        self.filter_timer.stop()
+        self.running_filter = None
+
+    def restart_filter(self):
+        """Start a running filter pass over, after the rows it was testing changed"""
+        if self.running_filter:
+            self.start_filter(self.running_filter[0])
+
+    def set_modified_only(self, enabled):
+        """Hide entries without uncommitted edits, on top of the current filter"""
+        self.modified_only = enabled
+        self.refilter()
+        self.restart_filter()
+
+    def refilter(self):
+        """Re-run the filter over every entry, keeping the selection on rows that stay"""
+        self.apply_rows(self.filter_rows())
+
+    def apply_rows(self, source_rows):
+        if source_rows == self.source_rows:
+            return  # Nothing to relayout, e.g. a keystroke that hides no more rows
+        self.layoutAboutToBeChanged.emit()
+        persistent, entries = self.persistent_entries()
+        self.source_rows = source_rows
+        self.remap_persistent(persistent, entries)
+        self.layoutChanged.emit()
+
+    def persistent_entries(self):
+        persistent = self.persistentIndexList()
+        entries = self.sourceModel().entries
+        return persistent, [entries[self.source_rows[index.row()]] for index in persistent]
+
+    def remap_persistent(self, persistent, entries):
+        rows_by_id = self.sourceModel().rows_by_id
+        self.changePersistentIndexList(persistent, [
+            self.mapFromSource(self.sourceModel().index(rows_by_id[entry.id], index.column()))
+            for index, entry in zip(persistent, entries)
+        ])
+
+    def on_source_layout_about_to_change(self):
+        self.layoutAboutToBeChanged.emit()
+        self.layout_entries = self.persistent_entries()
+
+    def on_source_layout_changed(self):
+        persistent, entries = self.layout_entries
+        self.layout_entries = None
+        self.source_rows = self.filter_rows()
+        self.remap_persistent(persistent, entries)
+        self.layoutChanged.emit()
+        self.restart_filter()
+
+    def on_source_reset(self):
+        self.source_rows = self.filter_rows()
+        self.endResetModel()
+        self.restart_filter()
+
+    def on_source_rows_inserted(self, parent, first, last):
+        # The source only appends, so new rows go after every shown row
+        rows = self.filter_rows(range(first, last + 1))
+        if rows:
+            start = len(self.source_rows)
+            self.beginInsertRows(QtCore.QModelIndex(), start, start + len(rows) - 1)
+            self.source_rows.extend(rows)
+            self.endInsertRows()
+        self.restart_filter()
+
+    def on_source_data_changed(self, top_left, bottom_right, roles=()):
+        first = bisect.bisect_left(self.source_rows, top_left.row())
+        last = bisect.bisect_right(self.source_rows, bottom_right.row()) - 1
+        if first <= last:
+            self.dataChanged.emit(self.index(first, top_left.column()),
+                                  self.index(last, bottom_right.column()), roles)
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QtCore.QModelIndex()
+        # Called for every painted cell; proxy indexes are always in range, so skip index()'s checks
+        return self.sourceModel().createIndex(self.source_rows[proxy_index.row()], proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QtCore.QModelIndex()
+        row = bisect.bisect_left(self.source_rows, source_index.row())
+        if row == len(self.source_rows) or self.source_rows[row] != source_index.row():
+            return QtCore.QModelIndex()  # Filtered out
+        return self.createIndex(row, source_index.column())
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self.source_rows) or not 0 <= column < self.columnCount():
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QtCore.QModelIndex()):
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.source_rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """Paint the folder, play, edit and artwork buttons of the actions column and handle their clicks
+
+    The buttons are only drawn, so no row carries widgets. Which buttons show, and the play
+    button's state, come from the model.
+    """
+    action_clicked = pyqtSignal(str, object)  # 'folder', 'play', 'edit' or 'artwork'; SongRecord
+    BUTTON_WIDTH = 30
+    SPACING = 5
+    MARGIN = 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pressed = None  # (QPersistentModelIndex, action) of the button held down
+
+    def buttons(self, option, index):
+        """Get (action, rect, text, enabled, tooltip) for each button of a cell"""
+        entry = index.data(SongTableModel.ENTRY_ROLE)
+        play_state = index.data(SongTableModel.PLAY_STATE_ROLE)
+        specs = [('folder', "📁", True, "Open song folder")]
+        if play_state == 'missing':
+            specs.append(('play', "\U0001F507", False, "No audio file found"))
+        elif not entry.music:
+            specs.append(('play', "▶️", False, "No audio file found"))
+        elif play_state == 'muted':
+            specs.append(('play', "\U0001F507", True, "Audio playback disabled"))
+        elif play_state == 'playing':
+            specs.append(('play', "⏹", True, "Stop"))
+        else:
+            specs.append(('play', "▶️", True, "Play"))
+        specs.append(('edit', "✏️", True, "Edit all metadata"))
+        if index.data(SongTableModel.ARTWORK_ROLE):
+            specs.append(('artwork', "📸", True, "Compare Artwork"))
+
+        area = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        width = min(self.BUTTON_WIDTH, (area.width() - self.SPACING * (len(specs) - 1)) // len(specs))
+        height = min(area.height(), 26)
+        top = area.top() + (area.height() - height) // 2
+        return [
+            (action, QtCore.QRect(area.left() + i * (width + self.SPACING), top, width, height), text, enabled, tooltip)
+            for i, (action, text, enabled, tooltip) in enumerate(specs)
+        ]
+
+    def action_at(self, option, index, pos):
+        for action, rect, _, enabled, _ in self.buttons(option, index):
+            if enabled and rect.contains(pos):
+                return action
+        return None
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)  # Background and selection
+        style = QApplication.style()
+        cursor = option.widget.viewport().mapFromGlobal(QCursor.pos()) if option.widget else None
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        pressed_action = self.pressed[1] if self.pressed and self.pressed[0] == index else None
+
+        for action, rect, text, enabled, _ in self.buttons(option, index):
+            is_hovered = enabled and hovered and cursor is not None and rect.contains(cursor)
+            if action == 'artwork':
+                # Same blue as the Shazam suggestion buttons
+                painter.save()
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(QColor("#357abd" if is_hovered or pressed_action == action else "#4a90e2"))
+                painter.drawRoundedRect(QtCore.QRectF(rect), 4, 4)
+                painter.setPen(QColor("white"))
+                painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+                painter.restore()
+                continue
+
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = text
+            button.palette = option.palette
+            button.state = QStyle.StateFlag.State_Enabled if enabled else QStyle.StateFlag.State_None
+            if is_hovered:
+                button.state |= QStyle.StateFlag.State_MouseOver
+            button.state |= QStyle.StateFlag.State_Sunken if pressed_action == action else QStyle.StateFlag.State_Raised
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter)
+
+    def editorEvent(self, event, model, option, index):
+        event_type = event.type()
+        if event_type not in (QtCore.QEvent.Type.MouseButtonPress, QtCore.QEvent.Type.MouseButtonDblClick,
+                              QtCore.QEvent.Type.MouseButtonRelease):
             return False
-            
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+        action = self.action_at(option, index, event.position().toPoint())
+
+        if event_type != QtCore.QEvent.Type.MouseButtonRelease:
+            # Swallow presses on a button so they don't change the selection
+            self.pressed = (QtCore.QPersistentModelIndex(index), action) if action else None
+            return action is not None
+
+        pressed, self.pressed = self.pressed, None
+        if action and pressed == (index, action):
+            self.action_clicked.emit(action, index.data(SongTableModel.ENTRY_ROLE))
+        return pressed is not None
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QtCore.QEvent.Type.ToolTip:
+            for _, rect, _, _, tooltip in self.buttons(option, index):
+                if rect.contains(event.pos()):
+                    QToolTip.showText(event.globalPos(), tooltip, view)
+                    return True
+            QToolTip.hideText()
+            return True
+        return super().helpEvent(event, view, option, index)
+
+class SuggestionDelegate(QStyledItemDelegate):
+    """Paint a pending Shazam suggestion over its cell; left click accepts it, right click keeps the current value"""
+    suggestion_accepted = pyqtSignal(object, str, str)  # SongRecord, field, Shazam value
+    suggestion_rejected = pyqtSignal(object, str, str)  # SongRecord, field, current value
+    ROW_HEIGHT = 70  # Fits both the current and the suggested value
+
+    def paint(self, painter, option, index):
+        suggestion = index.data(SongTableModel.SUGGESTION_ROLE)
+        if not suggestion:
+            super().paint(painter, option, index)
+            return
+        current_value, new_value = suggestion
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#357abd" if hovered else "#4a90e2"))
+        rect = option.rect.adjusted(4, 4, -4, -4)
+        painter.drawRoundedRect(QtCore.QRectF(rect), 4, 4)
+
+        text_rect = rect.adjusted(8, 4, -8, -4)
+        new_font = QFont(option.font)
+        new_font.setPointSize(10)
+        new_font.setBold(True)
+        if text_rect.height() >= 36:
+            current_font = QFont(option.font)
+            current_font.setPointSize(9)
+            painter.setFont(current_font)
+            painter.setPen(QColor("#ccc"))
+            painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+                             painter.fontMetrics().elidedText(f"Current: {current_value}", Qt.TextElideMode.ElideRight, text_rect.width()))
+            alignment = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom
+        else:
+            # Row not (yet) enlarged: show just the suggested value
+            alignment = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        painter.setFont(new_font)
+        painter.setPen(QColor("white"))
+        painter.drawText(text_rect, alignment,
+                         painter.fontMetrics().elidedText(f"New: {new_value}", Qt.TextElideMode.ElideRight, text_rect.width()))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        suggestion = index.data(SongTableModel.SUGGESTION_ROLE)
+        if not suggestion:
+            return super().editorEvent(event, model, option, index)
+        event_type = event.type()
+        if event_type in (QtCore.QEvent.Type.MouseButtonPress, QtCore.QEvent.Type.MouseButtonDblClick):
+            return True
+        if event_type == QtCore.QEvent.Type.MouseButtonRelease:
+            entry = index.data(SongTableModel.ENTRY_ROLE)
+            field = SongTableModel.EDITABLE_COLUMNS[index.column()]
+            if event.button() == Qt.MouseButton.LeftButton:
+                self.suggestion_accepted.emit(entry, field, suggestion[1])
+            elif event.button() == Qt.MouseButton.RightButton:
+                self.suggestion_rejected.emit(entry, field, suggestion[0])
+            return True
+        return False
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QtCore.QEvent.Type.ToolTip and index.data(SongTableModel.SUGGESTION_ROLE):
+            QToolTip.showText(event.globalPos(), "Left click to use the Shazam value, right click to keep the current one", view)
+            return True
+        return super().helpEvent(event, view, option, index)
+
 class MetadataEditor(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -299,14 +1224,15 @@ class MetadataEditor(QMainWindow):
         self.setFixedSize(1600, 800)
         
         # Initialize all attributes first
-        self.current_playing = None
+        self.playing_id = None  # Entry ID of the song being played
         self.selected_entries = []
         self.file_entries = []
         self.selected_directories = set()
+        # Directory listings captured when packs are picked, reused by the loader and asset lookups
+        self.library_snapshot = LibrarySnapshot()
         self.bulk_edit_enabled = False
         self.shazam_mode = False
         self.audio_enabled = False
-        self.temp_widgets = []
         self.search_credits_button = None
         self.search_frame = None
         self.table = None
@@ -315,6 +1241,24 @@ class MetadataEditor(QMainWindow):
         self.shazam_btn = None
         self.commit_all_button = None
         self.search_box = None
+        self.search_timer = None
+        self.applied_search = None  # (query, predicate, model revision) of the search shown in the table
+        self.running_search = None  # Same for a search whose filter pass hasn't finished
+        self.parse_workers = PARSE_WORKERS
+        self.scan_thread = None
+        self.scan_cancelled = False
+        self.manifest_thread = None
+        self.chart_thread = None
+        self.chart_callbacks = []  # Run once the chart read in progress has finished
+        
+        # Open the persistent metadata cache used by the loader
+        self.metadata_cache = MetadataCache()
+        MetadataUtil.cache = self.metadata_cache
+        
+        # Pick up simfiles edited in other programs while they are loaded here
+        self.simfile_watcher = SimfileWatcher(self)
+        self.simfile_watcher.files_changed.connect(self.on_simfiles_changed)
+        MetadataUtil.watcher = self.simfile_watcher
         
         # Initialize pygame for audio
         try:
@@ -332,6 +1276,7 @@ class MetadataEditor(QMainWindow):
             'artist': False,
             'genre': False
         }
+        self.sort_columns = []  # (column, order) pairs of the current sort, most significant first
         
         # Setup UI components
         self.setup_ui()
@@ -381,13 +1326,28 @@ class MetadataEditor(QMainWindow):
         self.search_credits_button.clicked.connect(self.show_credit_search)
         left_buttons.addWidget(self.search_credits_button)
         
+        # Add show only modified toggle
+        self.modified_only_btn = QPushButton("Modified Only: OFF")
+        self.modified_only_btn.setToolTip("Show only songs with uncommitted changes")
+        self.modified_only_btn.clicked.connect(self.toggle_modified_only)
+        left_buttons.addWidget(self.modified_only_btn)
+        
         toolbar.addLayout(left_buttons)
         
         # Add search box with clear directories button in the middle
         search_layout = QHBoxLayout()
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search...")
-        self.search_box.textChanged.connect(self.apply_search_filter)
+        self.search_box.setToolTip(
+            "Plain text searches pack, title, subtitle, artist, genre and credits.\n"
+            "artist:camellia  pack:\"DDR A\"  credit:name  type:ssc  scope a term to one field\n"
+            "genre:  (empty)   genre:*  (not empty)   -term  (exclude)   a OR b  (either)"
+        )
+        self.search_box.textChanged.connect(self.schedule_search)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.apply_search_filter)
         search_layout.addWidget(self.search_box)
         
         # Modify clear button to be a clear directories button
@@ -421,9 +1381,6 @@ class MetadataEditor(QMainWindow):
         
         self.main_layout.addLayout(toolbar)
         
-        # Initialize table widget before setup
-        self.table = QTableWidget()
-        
         # Setup table
         self.setup_table()
         self.main_layout.addWidget(self.table)
@@ -464,6 +1421,27 @@ class MetadataEditor(QMainWindow):
         self.main_layout.addWidget(self.display_count_frame)
         self.display_count_frame.hide()  # Hidden by default
         
+        # Background load progress, shown while packs are being scanned
+        self.load_progress_frame = QFrame()
+        progress_layout = QHBoxLayout(self.load_progress_frame)
+        progress_layout.setContentsMargins(4, 0, 4, 0)
+        
+        self.load_progress_bar = QProgressBar()
+        self.load_progress_bar.setMaximumWidth(300)
+        progress_layout.addWidget(self.load_progress_bar)
+        
+        self.load_progress_label = QLabel()
+        self.load_progress_label.setStyleSheet("color: #666;")
+        progress_layout.addWidget(self.load_progress_label)
+        progress_layout.addStretch()
+        
+        self.load_cancel_button = QPushButton("Cancel")
+        self.load_cancel_button.clicked.connect(self.cancel_loading)
+        progress_layout.addWidget(self.load_cancel_button)
+        
+        self.main_layout.addWidget(self.load_progress_frame)
+        self.load_progress_frame.hide()
+        
         # Set application-wide stylesheet for modern scrollbars
         self.setStyleSheet("""
             QScrollBar:vertical {
@@ -596,27 +1574,19 @@ class MetadataEditor(QMainWindow):
         
         if reply == QMessageBox.StandardButton.Yes:
             success_count = 0
-            # Get selected rows
-            selected_rows = set(item.row() for item in self.table.selectedItems())
             
-            for row in selected_rows:
-                # Get the ID from the current row
-                id_item = self.table.item(row, self.COL_ID)
-                if not id_item:
-                    continue
-                
-                # Find the entry using ID
-                entry_id = id_item.text()
-                entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-                
-                if entry and 'filepaths' in entry:
-                    for filepath in entry['filepaths']:
-                        try:
-                            if MetadataUtil.write_metadata(filepath, {'CREDIT': credit_value}):
-                                success_count += 1
-                        except Exception as e:
-                            print(f"Error updating credit for {filepath}: {str(e)}")
-                            continue
+            for entry in self.get_selected_entries():
+                for filepath in entry.filepaths:
+                    try:
+                        if MetadataUtil.write_metadata(filepath, {'CREDIT': credit_value}):
+                            success_count += 1
+                            if filepath == entry.filepaths[0]:
+                                # Keep the song's searchable credits in step with its primary file
+                                entry.credits = (credit_value,)
+                                self.table_model.refresh_entry(entry)
+                    except Exception as e:
+                        print(f"Error updating credit for {filepath}: {str(e)}")
+                        continue
             
             if success_count > 0:
                 QMessageBox.information(
@@ -635,42 +1605,46 @@ class MetadataEditor(QMainWindow):
 
 
     def setup_table(self):
-        """Set up the main table widget"""
-        self.table = QTableWidget()
-        self.table.setColumnCount(11)  # Add one more column for ID
+        """Set up the main table view over the song model"""
+        self.table_model = SongTableModel(self.file_entries, self)
+        self.table_model.entry_edited.connect(self.on_entry_edited)
+        self.table_proxy = SongFilterProxyModel(self)
+        self.table_proxy.setSourceModel(self.table_model)
+        self.table_proxy.filter_finished.connect(self.on_search_finished)
+        
+        # Rows are only realized for the part of the table on screen
+        self.table = QTableView()
+        self.table.setModel(self.table_proxy)
         
         # Define column indices
-        self.COL_CHECKBOX = 0
-        self.COL_ACTIONS = 1
-        self.COL_TYPE = 2
-        self.COL_PACK = 3
-        self.COL_TITLE = 4
-        self.COL_SUBTITLE = 5
-        self.COL_ARTIST = 6
-        self.COL_GENRE = 7
-        self.COL_STATUS = 8
-        self.COL_COMMIT = 9
-        self.COL_ID = 10
-        
-        # Set headers
-        headers = ['', 'Actions', 'Type', 'Pack', 'Title', 'Subtitle', 'Artist', 'Genre', 'Status', 'Commit', 'ID']
-        self.table.setHorizontalHeaderLabels(headers)
+        self.COL_CHECKBOX = SongTableModel.COL_CHECKBOX
+        self.COL_ACTIONS = SongTableModel.COL_ACTIONS
+        self.COL_TYPE = SongTableModel.COL_TYPE
+        self.COL_PACK = SongTableModel.COL_PACK
+        self.COL_TITLE = SongTableModel.COL_TITLE
+        self.COL_SUBTITLE = SongTableModel.COL_SUBTITLE
+        self.COL_ARTIST = SongTableModel.COL_ARTIST
+        self.COL_GENRE = SongTableModel.COL_GENRE
+        self.COL_STATUS = SongTableModel.COL_STATUS
+        self.COL_COMMIT = SongTableModel.COL_COMMIT
+        self.COL_ID = SongTableModel.COL_ID
+        self.CHART_COLUMNS = SongTableModel.CHART_COLUMNS
         
         # Set edit triggers for single-click editing
         self.table.setEditTriggers(
-            QTableWidget.EditTrigger.CurrentChanged |
-            QTableWidget.EditTrigger.DoubleClicked |
-            QTableWidget.EditTrigger.EditKeyPressed |
-            QTableWidget.EditTrigger.AnyKeyPressed
+            QTableView.EditTrigger.CurrentChanged |
+            QTableView.EditTrigger.DoubleClicked |
+            QTableView.EditTrigger.EditKeyPressed |
+            QTableView.EditTrigger.AnyKeyPressed
         )
         
         # Set selection behavior
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.ExtendedSelection)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
         
         # Set lighter selection color
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 selection-background-color: rgba(53, 122, 189, 0.3);
             }
         """)
@@ -681,148 +1655,176 @@ class MetadataEditor(QMainWindow):
             if col == 1:  # Actions column
                 self.table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeMode.Fixed)
             # Make non-editable columns read-only
-            if col not in [3,4, 5, 6, 7]:  # Not Title, Subtitle, Artist, or Genre
+            if col not in [3,4, 5, 6, 7] + list(self.CHART_COLUMNS):  # Not Title, Subtitle, Artist, Genre or chart columns
                 self.table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeMode.Fixed)
         
+        for col in self.CHART_COLUMNS:
+            self.table.setColumnHidden(col, True)
+        
         # Connect signals
-        self.table.cellChanged.connect(self.on_cell_changed)
+        self.table.clicked.connect(self.on_table_clicked)
         self.table.horizontalHeader().sectionClicked.connect(self.sort_table)
-        
-
-
-
-
-
-
-
-
-    def create_file_entry_with_type(self, filepaths, file_type, parent_dir, title, subtitle, artist, genre, music_file):
-        """Create a file entry with specified type in the table"""
-        try:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            # Create unique ID and increment counter
-            entry_id = str(self.entry_counter)
-            self.entry_counter += 1
-            
-            # Add empty checkbox column item and make it non-editable
-            checkbox_item = QTableWidgetItem("")
-            checkbox_item.setFlags(checkbox_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row, self.COL_CHECKBOX, checkbox_item)
-            
-            # Store entry data with ID
-            entry_data = {
-                'id': entry_id,
-                'filepaths': filepaths,
-                'original_values': {
-                    'title': title,
-                    'subtitle': subtitle,
-                    'artist': artist,
-                    'genre': genre
-                }
-            }
-            self.file_entries.append(entry_data)
-            
-            # Add ID to table
-            id_item = QTableWidgetItem(entry_id)
-            id_item.setFlags(id_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row, self.COL_ID, id_item)
-            
-            # Create action buttons with ID reference
-            action_widget = self.create_action_buttons(row, filepaths, music_file, entry_id)
-            self.table.setCellWidget(row, self.COL_ACTIONS, action_widget)
-            
-            # Set file type and parent directory (read-only)
-            type_item = QTableWidgetItem(file_type)
-            type_item.setFlags(type_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row, 2, type_item)
-            
-            pack_item = QTableWidgetItem(parent_dir)
-            pack_item.setFlags(pack_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row, 3, pack_item)
-
-            # Create editable metadata fields
-            metadata_fields = {
-                4: ('title', title),
-                5: ('subtitle', subtitle),
-                6: ('artist', artist),
-                7: ('genre', genre)
-            }
-
-            for col, (field, value) in metadata_fields.items():
-                item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
-                self.table.setItem(row, col, item)
-
-            # Add empty status and commit columns (read-only)
-            status_item = QTableWidgetItem("")
-            status_item.setFlags(status_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row, 8, status_item)
+        self.table.horizontalHeader().setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.table.horizontalHeader().customContextMenuRequested.connect(self.show_header_menu)
+        
+        # Row buttons and Shazam suggestions are painted by delegates, so rows carry no widgets
+        self.table.setMouseTracking(True)  # Hover highlight on painted buttons
+        self.action_delegate = ActionButtonDelegate(self.table)
+        self.action_delegate.action_clicked.connect(self.on_row_action)
+        self.table.setItemDelegateForColumn(self.COL_ACTIONS, self.action_delegate)
+        self.suggestion_delegate = SuggestionDelegate(self.table)
+        self.suggestion_delegate.suggestion_accepted.connect(
+            lambda entry, field, value: self.apply_shazam_value(entry.id, field, value)
+        )
+        self.suggestion_delegate.suggestion_rejected.connect(
+            lambda entry, field, value: self.reject_shazam_value(entry.id, field, value)
+        )
+        for col in SongTableModel.EDITABLE_COLUMNS:
+            self.table.setItemDelegateForColumn(col, self.suggestion_delegate)
+            
+        # Rows re-added by a filter come back at the default height, so re-enlarge suggestion rows
+        self.suggestion_row_timer = QTimer(self)
+        self.suggestion_row_timer.setSingleShot(True)
+        self.suggestion_row_timer.setInterval(0)
+        self.suggestion_row_timer.timeout.connect(self.update_suggestion_rows)
+        for signal in (self.table_proxy.rowsInserted, self.table_proxy.layoutChanged):
+            signal.connect(self.suggestion_row_timer.start)
+        
+    def entry_at(self, row):
+        """Get the SongRecord shown at a table row"""
+        return self.table_proxy.index(row, 0).data(SongTableModel.ENTRY_ROLE)
+        
+    def get_selected_entries(self):
+        """Get the SongRecords of the selected rows, in table order"""
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        return [self.entry_at(row) for row in rows]
+        
+    def on_table_clicked(self, index):
+        """Commit a row when its commit cell is clicked"""
+        if index.column() == self.COL_COMMIT:
+            entry = index.data(SongTableModel.ENTRY_ROLE)
+            if entry and self.table_model.is_pending(entry):
+                self.commit_changes(entry)
+        
+    def show_header_menu(self, pos):
+        """Show the header context menu for toggling the optional chart columns"""
+        menu = QMenu(self)
+        for col in self.CHART_COLUMNS:
+            action = menu.addAction(self.table_model.headerData(col, Qt.Orientation.Horizontal))
+            action.setCheckable(True)
+            action.setChecked(not self.table.isColumnHidden(col))
+            action.toggled.connect(lambda checked, c=col: self.set_chart_column_visible(c, checked))
+        menu.exec(self.table.horizontalHeader().mapToGlobal(pos))
+        
+    def set_chart_column_visible(self, col, visible):
+        """Show or hide a chart column, reading chart headers the first time one is shown"""
+        self.table.setColumnHidden(col, not visible)
+        if visible:
+            self.populate_chart_columns()
+            
+    def populate_chart_columns(self, entries=None):
+        """Read chart headers in the background for the given entries (default all) that lack them,
+        if any chart column is shown"""
+        if entries is None:
+            entries = self.file_entries
+        if self.visible_chart_columns():
+            self.read_charts(entries)
+            
+    def with_chart_credits(self, callback):
+        """Run callback once every .ssc song's chart credits are known, reading missing ones in the background"""
+        missing = [entry for entry in self.file_entries if entry.lacks_chart_credits()]
+        if not missing:
+            callback()
+            return
+        self.chart_callbacks.append(callback)
+        self.read_charts(missing)
+        
+    def read_charts(self, entries):
+        """Read chart headers in the background for the given entries that lack them"""
+        missing = [entry for entry in entries if entry.charts is None]
+        running = self.chart_thread
+        if running:
+            # Restart with the songs the running read hasn't delivered yet; its queued batches are dropped
+            self.chart_thread = None
+            running.requestInterruption()
+            running.wait()
+            missing = [entry for entry in dict.fromkeys(running.entries + missing) if entry.charts is None]
+        if not missing:
+            self.run_chart_callbacks()
+            return
             
-            commit_item = QTableWidgetItem("")
-            commit_item.setFlags(commit_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row, 9, commit_item)
+        self.statusBar().showMessage(f"Reading chart headers for {len(missing)} songs...")
+        thread = ChartScanThread(missing, self.parse_workers, self)
+        thread.charts_read.connect(self.add_chart_batch)
+        thread.progress.connect(self.update_chart_progress)
+        thread.finished.connect(self.finish_chart_scan)
+        self.chart_thread = thread
+        thread.start()
+        
+    def visible_chart_columns(self):
+        return [col for col in self.CHART_COLUMNS if not self.table.isColumnHidden(col)]
+        
+    def add_chart_batch(self, batch):
+        """Store chart headers read by the chart thread and repaint the chart columns"""
+        if self.sender() is not self.chart_thread:
+            return  # Queued by a read that was since restarted or stopped
+        for entry, charts in batch:
+            # Chart credits are searched like the header ones; rows dropped since aren't re-indexed
+            if entry.set_charts(charts) and self.table_model.entry_by_id(entry.id) is entry:
+                self.table_model.forget_cached_keys(entry)
+        # Chart cells are summarised from the records as they are painted
+        self.table_model.refresh_columns(self.visible_chart_columns())
+        
+    def update_chart_progress(self, done, total):
+        if self.sender() is self.chart_thread:
+            self.statusBar().showMessage(f"Reading chart headers... {done}/{total} songs")
+            
+    def finish_chart_scan(self):
+        thread = self.sender()
+        thread.deleteLater()
+        if thread is not self.chart_thread:
+            return
+        self.chart_thread = None
+        self.metadata_cache.flush()
+        self.statusBar().showMessage("Chart headers read")
+        self.run_chart_callbacks()
+        
+    def run_chart_callbacks(self):
+        callbacks, self.chart_callbacks = self.chart_callbacks, []
+        for callback in callbacks:
+            callback()
+            
+    def stop_chart_scan(self):
+        self.chart_callbacks = []
+        thread, self.chart_thread = self.chart_thread, None
+        if thread:
+            thread.requestInterruption()
+            thread.wait()
+            
+    def new_file_entry(self, filepaths, file_type, parent_dir, title, subtitle, artist, genre, music_file,
+                       assets=None, credits=()):
+        """Create a song record with the next unique ID, without adding it to the table"""
+        # Create unique ID and increment counter
+        entry_id = self.entry_counter
+        self.entry_counter += 1
+        
+        # Store entry data with ID
+        entry_data = SongRecord(
+            entry_id, filepaths, file_type, parent_dir,
+            title, subtitle, artist, genre, music_file, credits
+        )
+        entry_data.assets = assets
+        return entry_data
 
-            return entry_data
-
-        except Exception as e:
-            print(f"Error in create_file_entry_with_type: {str(e)}")
-            traceback.print_exc()
-            return None
-
-    def on_entry_change(self, row, filepath, field):
-        """Handle changes to table entries"""
-        try:
-            # Map field names to column indices
-            col_map = {
-                'title': 4,
-                'artist': 6,
-                'genre': 7,
-                'subtitle': 5
-            }
-            
-            # Get column index for the field
-            col_index = col_map.get(field)
-            if col_index is None:
-                print(f"Warning: Invalid field name: {field}")
-                return
-            
-            # Get the item from the table
-            item = self.table.item(row, col_index)
-            if not item:
-                print(f"Warning: No item found at row {row}, column {col_index}")
-                return
-            
-            # Update status column
-            status_item = QTableWidgetItem("⚠")
-            status_item.setToolTip("Unsaved changes")
-            self.table.setItem(row, 8, status_item)  # Status column
-            
-        except Exception as e:
-            print(f"Error in on_entry_change: {str(e)}")
-            import traceback
-            traceback.print_exc()
+    def on_entry_edited(self, entry, field):
+        """Handle a field edited in the table, by bulk edit or by accepting a Shazam suggestion"""
+        self.update_commit_all_button()
 
     def update_commit_all_button(self):
         """Update the commit all button state"""
         try:
-            # Count rows with unsaved changes by checking both item and widget status
-            uncommitted = 0
-            for row in range(self.table.rowCount()):
-                status_widget = self.table.cellWidget(row, 8)
-                status_item = self.table.item(row, 8)
-                
-                has_warning = False
-                if status_widget and isinstance(status_widget, QWidget):
-                    label = status_widget.findChild(QLabel)
-                    if label and label.text() == "⚠":
-                        has_warning = True
-                elif status_item and status_item.text() == "⚠":
-                    has_warning = True
-                    
-                if has_warning:
-                    uncommitted += 1
+            # The model tracks songs with unsaved changes as they are edited and committed
+            uncommitted = len(self.table_model.pending)
             
             if uncommitted > 0:
                 self.commit_all_button.setText(f"Commit Changes ({uncommitted})")
@@ -836,50 +1838,24 @@ class MetadataEditor(QMainWindow):
             import traceback
             traceback.print_exc()
 
-    def commit_changes(self, row, filepaths):
-        """Commit changes for a single row"""
+    def commit_changes(self, entry):
+        """Commit changes for a single song"""
         try:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                return False
-                
-            # Find the entry using ID
-            entry_id = id_item.text()
-            entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-            if not entry:
-                return False
-
             # Collect changes
-            changes = {}
-            for field, col in [
-                ('title', self.COL_TITLE),
-                ('subtitle', self.COL_SUBTITLE),
-                ('artist', self.COL_ARTIST),
-                ('genre', self.COL_GENRE)
-            ]:
-                item = self.table.item(row, col)
-                if item and item.text() != entry['original_values'][field]:
-                    changes[field.upper()] = item.text()
+            changes = entry.get_changes()
 
             if changes:
                 # Write changes to all files
                 success = True
-                for filepath in filepaths:
+                for filepath in entry.filepaths:
                     if not MetadataUtil.write_metadata(filepath, changes):
                         success = False
                         break
 
                 if success:
-                    # Update original values
-                    for field, value in changes.items():
-                        entry['original_values'][field.lower()] = value
-
-                    # Clear status and commit columns
-                    self.table.removeCellWidget(row, 8)  # Status column
-                    self.table.removeCellWidget(row, 9)  # Commit column
-                    self.table.setItem(row, 9, QTableWidgetItem(""))
-                    self.table.setItem(row, 8, QTableWidgetItem("✓"))
+                    # Update original values; the row now shows as committed
+                    entry.mark_committed(changes)
+                    self.table_model.mark_committed(entry)
 
                     # Update commit all button
                     self.update_commit_all_button()
@@ -896,36 +1872,15 @@ class MetadataEditor(QMainWindow):
         """Commit all pending changes"""
         try:
             committed_count = 0
-            total_rows = self.table.rowCount()
             
-            for row in range(total_rows):
-                # Get the ID from the current row
-                id_item = self.table.item(row, self.COL_ID)
-                if not id_item:
-                    continue
+            # Only songs with uncommitted changes are visited, in table order
+            rows_by_id = self.table_model.rows_by_id
+            for entry_id in sorted(self.table_model.pending, key=rows_by_id.get):
+                if self.commit_changes(self.table_model.entry_by_id(entry_id)):
+                    committed_count += 1
                     
-                # Find the entry using ID
-                entry_id = id_item.text()
-                entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-                if not entry:
-                    continue
-
-                # Check if row has uncommitted changes
-                has_changes = False
-                for field, col in [
-                    ('title', self.COL_TITLE),
-                    ('subtitle', self.COL_SUBTITLE),
-                    ('artist', self.COL_ARTIST),
-                    ('genre', self.COL_GENRE)
-                ]:
-                    item = self.table.item(row, col)
-                    if item and item.text() != entry['original_values'][field]:
-                        has_changes = True
-                        break
-
-                if has_changes:
-                    if self.commit_changes(row, entry['filepaths']):
-                        committed_count += 1
+            if self.table_proxy.modified_only:
+                self.refresh_filter()
 
             if committed_count > 0:
                 QMessageBox.information(
@@ -949,9 +1904,9 @@ class MetadataEditor(QMainWindow):
                 f"An error occurred while committing changes: {str(e)}"
             )
 
-    async def do_shazam_analysis(self, file_path, row):
+    async def do_shazam_analysis(self, file_path, entry_id):
         """Perform Shazam analysis"""
-        if self.shazam_mode and row != -1:
+        if self.shazam_mode:
             print("Starting Shazam analysis...")
             try:
                 result = await self.analyze_single_file(file_path)
@@ -963,7 +1918,7 @@ class MetadataEditor(QMainWindow):
                         'genre': track.get('genres', {}).get('primary', ''),
                         'images': {'coverart': track['share']['image']} if 'share' in track and 'image' in track['share'] else {}
                     }
-                    self.show_shazam_results(row, shazam_data)
+                    self.show_shazam_results(entry_id, shazam_data)
                 else:
                     print("No Shazam results found")
             except Exception as e:
@@ -971,130 +1926,82 @@ class MetadataEditor(QMainWindow):
                 import traceback
                 traceback.print_exc()
 
-    def play_audio(self, music_path, play_btn, entry_id):
+    def get_song_assets(self, entry):
+        """Get a song's asset index, rebuilding it if files in its folder were added, removed or renamed"""
+        assets = entry.assets
+        if assets is None or not assets.is_current():
+            song_dir = os.path.dirname(entry.filepaths[0])
+            self.library_snapshot.refresh(song_dir)
+            metadata = MetadataUtil.read_header_cached(entry.filepaths[0])
+            assets = SongAssets.build(
+                song_dir, self.library_snapshot.files(song_dir),
+                metadata.get('MUSIC', ''), metadata.get('JACKET', '')
+            )
+            entry.assets = assets
+        return assets
+        
+    def play_audio(self, entry_id):
         """Play audio file with fallback logic"""
         try:
             # Handle current playing button
-            try:
-                if self.current_playing:
+            stopped_id, self.playing_id = self.playing_id, None
+            if stopped_id is not None:
+                try:
                     pygame.mixer.music.stop()
-                    self.current_playing.setText("▶")
-                    if self.current_playing == play_btn:
-                        self.current_playing = None
-                        return
-            except RuntimeError:
-                self.current_playing = None
-            except Exception as e:
-                print(f"Error handling current playing button: {str(e)}")
-                self.current_playing = None
-
-            directory = os.path.dirname(music_path)
-            base_filename = os.path.basename(music_path)
+                except Exception as e:
+                    print(f"Error stopping playback: {str(e)}")
+                stopped = self.table_model.entry_by_id(stopped_id)
+                if stopped:
+                    self.table_model.set_play_state(stopped, '')
+                if stopped_id == entry_id:
+                    return  # Pressing the playing song's button again just stops it
+
+            entry = self.table_model.entry_by_id(entry_id)
+            if not entry:
+                return
+            assets = self.get_song_assets(entry)
+            directory = assets.song_dir
             found_playable = False
             actual_path = None
 
-            # Priority 1: Exact filepath
-            if os.path.exists(music_path):
-                actual_path = music_path
-                if self.audio_enabled:
-                    try:
-                        pygame.mixer.music.load(music_path)
-                        found_playable = True
-                        print(f"Using exact file: {music_path}")
-                    except Exception as e:
-                        print(f"Failed to load exact file: {str(e)}")
-                else:
+            # Candidates were resolved when the folder was indexed: the exact MUSIC file,
+            # else audio files named like it, else the smallest audio file
+            for candidate in assets.music_candidates:
+                actual_path = candidate
+                if not self.audio_enabled:
                     found_playable = True  # Consider it "playable" for Shazam purposes
-
-            # Priority 2: Using filename as mask
-            if not actual_path and base_filename:
-                mask_term = os.path.splitext(base_filename)[0]
-                for file in os.listdir(directory):
-                    if mask_term in file and file.lower().endswith(tuple(SUPPORTED_AUDIO)):
-                        test_path = os.path.join(directory, file)
-                        actual_path = test_path
-                        if self.audio_enabled:
-                            try:
-                                pygame.mixer.music.load(test_path)
-                                found_playable = True
-                                print(f"Using masked file: {test_path}")
-                                break
-                            except Exception as e:
-                                print(f"Failed to load masked file {file}: {str(e)}")
-                        else:
-                            found_playable = True  # Consider it "playable" for Shazam purposes
-                            break
-
-            # Priority 3: Any supported audio file (smallest one)
-            if not actual_path:
-                audio_files = []
-                for file in os.listdir(directory):
-                    if file.lower().endswith(tuple(SUPPORTED_AUDIO)):
-                        file_path = os.path.join(directory, file)
-                        try:
-                            size = os.path.getsize(file_path)
-                            audio_files.append((size, file_path))
-                        except Exception as e:
-                            print(f"Failed to get size for {file}: {str(e)}")
-
-                if audio_files:
-                    # Sort by size, then by path (for same-size files)
-                    audio_files.sort(key=lambda x: (x[0], x[1]))
-                    actual_path = audio_files[0][1]
-                    if self.audio_enabled:
-                        try:
-                            pygame.mixer.music.load(audio_files[0][1])
-                            found_playable = True
-                            print(f"Using smallest audio file: {actual_path} ({audio_files[0][0]} bytes)")
-                        except Exception as e:
-                            print(f"Failed to load smallest audio file: {str(e)}")
-                    else:
-                        found_playable = True  # Consider it "playable" for Shazam purposes
+                    break
+                try:
+                    pygame.mixer.music.load(candidate)
+                    found_playable = True
+                    print(f"Using audio file: {candidate}")
+                    break
+                except Exception as e:
+                    print(f"Failed to load audio file {candidate}: {str(e)}")
 
             if found_playable and actual_path:
                 if self.audio_enabled:
                     pygame.mixer.music.play()
-                    play_btn.setText("⏹")
-                    play_btn.setEnabled(True)
-                    self.current_playing = play_btn
+                    self.playing_id = entry_id
+                    self.table_model.set_play_state(entry, 'playing')
                 else:
-                    play_btn.setText("\U0001F507")  # Unicode for speaker with cancellation slash
-                    play_btn.setToolTip("Audio playback disabled")
+                    self.table_model.set_play_state(entry, 'muted')
                 
                 # If Shazam mode is active, analyze the file regardless of audio playback status
                 if self.shazam_mode:
-                    current_row = self.find_row_by_id(entry_id)
-                    if current_row != -1:
-                        self.run_shazam_analysis(actual_path, current_row)
+                    self.run_shazam_analysis(actual_path, entry_id)
             else:
                 print(f"No audio file found in {directory}")
-                play_btn.setText("\U0001F507")
-                play_btn.setEnabled(False)
-                play_btn.setToolTip("No audio file found")
+                self.table_model.set_play_state(entry, 'missing')
 
         except Exception as e:
             print(f"Error in play_audio: {str(e)}")
             traceback.print_exc()
 
-    def run_shazam_analysis(self, audio_path, row):
+    def run_shazam_analysis(self, audio_path, entry_id):
         """Run Shazam analysis on an audio file"""
         try:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                print("Debug: No ID item found for row", row)
-                return
-                
-            entry_id = id_item.text()
-            print(f"Debug: Running Shazam analysis for ID {entry_id} at row {row}")
-            
-            # Find current row for this ID (in case table was sorted)
-            current_row = self.find_row_by_id(entry_id)
-            if current_row == -1:
-                print(f"Debug: Could not find row for ID {entry_id}")
-                return
-            
-            print(f"Debug: Current row for ID {entry_id} is {current_row}")
+            print(f"Debug: Running Shazam analysis for ID {entry_id}")
             
             # Run Shazam analysis
             try:
@@ -1110,7 +2017,7 @@ class MetadataEditor(QMainWindow):
                         'images': {'coverart': track['share']['image']} if 'share' in track and 'image' in track['share'] else {}
                     }
                     print(f"Debug: Processed Shazam data: {shazam_data}")
-                    self.show_shazam_results(current_row, shazam_data)  # Use current_row here
+                    self.show_shazam_results(entry_id, shazam_data)
                 else:
                     print("Debug: No Shazam results found")
                 
@@ -1149,37 +2056,44 @@ class MetadataEditor(QMainWindow):
         directory = QFileDialog.getExistingDirectory(self, "Select Directory")
         if directory:
             try:
-                # Find all SM/SSC files and their parent packs
-                packs = set()
-                sm_files_found = False
-                
-                for root, _, files in os.walk(directory):
-                    for file in files:
-                        if file.endswith(tuple(SUPPORTED_EXTENSIONS)):
-                            sm_files_found = True
-                            # Get the song directory and its parent (pack directory)
-                            song_dir = os.path.dirname(os.path.join(root, file))
-                            pack_dir = os.path.dirname(song_dir)
-                            pack_name = os.path.basename(pack_dir)
-                            
-                            # Add to packs regardless of directory level
-                            if pack_name:
-                                packs.add((pack_name, pack_dir))
+                manifest = self.metadata_cache.get_pack_manifest(directory)
+                if manifest:
+                    # Open straight from the stored manifest; it is revalidated in the background
+                    packs = dict(manifest)
+                else:
+                    # List the whole tree once; the loader reuses these listings for song grouping
+                    self.library_snapshot.scan(directory)
+                    
+                    # Find all SM/SSC files and their parent packs, regardless of directory level
+                    packs = {
+                        pack_dir: self.library_snapshot.pack_manifest_entry(pack_dir)
+                        for _, pack_dir in self.library_snapshot.find_packs(directory)
+                    }
+                    if packs:
+                        self.metadata_cache.put_pack_manifest(directory, packs)
                 
                 if packs:
                     # Show pack selector dialog
-                    dialog = PackSelectorDialog(self, {name for name, _ in packs})
+                    dialog = PackSelectorDialog(
+                        self, {entry['name'] for entry in packs.values()}, self.summarize_packs(packs)
+                    )
                     dialog.setModal(True)
+                    if manifest:
+                        self.revalidate_pack_manifest(directory, packs, dialog)
                     
                     result = dialog.exec()
+                    dialog.closed = True
                     
                     if result == QDialog.DialogCode.Accepted:
                         selected_packs = dialog.selected_packs
-                        self.load_selected_packs(
-                            directory,
-                            {path for name, path in packs if name in selected_packs}
-                        )
-                elif sm_files_found:
+                        pack_paths = {path for path, entry in packs.items() if entry['name'] in selected_packs}
+                        if manifest:
+                            # Listings held from earlier in this session may predate changes on disk,
+                            # so the scan lists the chosen packs again
+                            for pack_dir in pack_paths:
+                                self.library_snapshot.forget(pack_dir)
+                        self.load_selected_packs(directory, pack_paths)
+                elif self.library_snapshot.has_simfiles(directory):
                     # If no packs found but SM files exist, treat selected directory as a pack
                     self.load_selected_packs(os.path.dirname(directory), {directory})
                 else:
@@ -1198,11 +2112,81 @@ class MetadataEditor(QMainWindow):
                     "Error",
                     f"An error occurred while loading directory: {str(e)}"
                 )
+                
+    @staticmethod
+    def summarize_packs(packs):
+        """Get (song count, total bytes) per pack name; packs sharing a name are selected together"""
+        summary = {}
+        for entry in packs.values():
+            song_count, total_bytes = summary.get(entry['name'], (0, 0))
+            summary[entry['name']] = (song_count + entry['song_count'], total_bytes + entry['total_bytes'])
+        return summary
+        
+    def revalidate_pack_manifest(self, root, packs, dialog):
+        """Check a stored manifest against the disk, updating packs and the open selector as changes are found"""
+        self.stop_manifest_check()
+            
+        def refresh_dialog(name):
+            if dialog.closed:
+                return
+            summary = self.summarize_packs(packs)
+            if name in summary:
+                dialog.update_pack(name, *summary[name])
+            else:
+                dialog.remove_pack(name)
+                
+        def on_pack_updated(pack_dir, entry):
+            packs[pack_dir] = entry
+            refresh_dialog(entry['name'])
+            
+        def on_pack_removed(pack_dir):
+            entry = packs.pop(pack_dir, None)
+            if entry:
+                refresh_dialog(entry['name'])
+                
+        def on_finished():
+            interrupted = thread.isInterruptionRequested()
+            thread.deleteLater()
+            if self.manifest_thread is thread:
+                self.manifest_thread = None
+            if interrupted:
+                # Stopped for a load: keep what was checked so far. Packs it didn't reach still
+                # carry their old folder mtime and are checked again on the next open
+                self.metadata_cache.put_pack_manifest(root, packs)
+                return
+            if thread.failed:
+                if not dialog.closed:
+                    dialog.set_status("Couldn't check packs for changes")
+                return
+            self.metadata_cache.put_pack_manifest(root, packs)
+            if not dialog.closed:
+                dialog.set_status("Pack list is up to date")
+                
+        thread = PackManifestThread(root, packs, self.library_snapshot, self)
+        thread.pack_updated.connect(on_pack_updated)
+        thread.pack_removed.connect(on_pack_removed)
+        thread.finished.connect(on_finished)
+        self.manifest_thread = thread
+        dialog.set_status("Checking packs for changes...")
+        thread.start()
+
+    def stop_manifest_check(self):
+        """Stop a running manifest check; the packs it already checked are still stored"""
+        if self.manifest_thread:
+            self.manifest_thread.requestInterruption()
+            self.manifest_thread.wait()
 
     def load_selected_packs(self, base_directory, selected_pack_paths):
         """Load selected packs with proper error handling"""
-        progress = None
         try:
+            if self.scan_thread:
+                QMessageBox.information(
+                    self,
+                    "Loading",
+                    "Packs are still loading. Wait for them to finish or cancel the load first."
+                )
+                return
+                
             # Get unique pack names of existing directories
             existing_pack_names = {os.path.basename(dir_path) for dir_path in self.selected_directories}
             
@@ -1220,49 +2204,12 @@ class MetadataEditor(QMainWindow):
                 )
                 return
                 
-            # Get current table row count
-            existing_rows = self.table.rowCount()
-            
-            # Create progress dialog with better styling
-            progress = QMessageBox(self)
-            progress.setWindowTitle("Loading")
-            if existing_rows > 0:
-                progress.setText(f"Reloading {existing_rows} existing songs, loading new songs...")
-            else:
-                progress.setText("Loading selected packs...")
-            progress.setStandardButtons(QMessageBox.StandardButton.NoButton)
-            progress.setStyleSheet("""
-                QMessageBox {
-                    min-width: 300px;
-                    min-height: 100px;
-                }
-            """)
-            progress.show()
-            QApplication.processEvents()
-            
             # Add the new pack paths to existing ones
             self.selected_directories.update(new_pack_paths)
             
-            # Clear existing table but preserve file_entries
-            old_entries = self.file_entries.copy()
-            self.table.setRowCount(0)
-            self.file_entries.clear()
-            
-            # Track loaded songs
-            loaded_songs = 0
-            
-            # Modify load_files_from_all_directories to update progress
-            def update_progress():
-                nonlocal loaded_songs
-                loaded_songs += 1
-                if existing_rows > 0:
-                    progress.setText(f"Reloading {existing_rows} existing songs... ({loaded_songs} new songs processed)")
-                else:
-                    progress.setText(f"Loading songs... ({loaded_songs} songs processed)")
-                QApplication.processEvents()
-            
-            # Pass the progress callback to load_files_from_all_directories
-            self.load_files_from_all_directories(update_progress)
+            # Only the new packs are enumerated and parsed; rows already loaded keep their
+            # pending edits and Shazam suggestions
+            self.load_files_from_directories(new_pack_paths)
             
         except Exception as e:
             print(f"Error loading packs: {str(e)}")
@@ -1273,194 +2220,259 @@ class MetadataEditor(QMainWindow):
                 "Load Error",
                 f"An error occurred while loading packs: {str(e)}"
             )
-        finally:
-            # Ensure progress dialog is properly cleaned up
-            if progress:
-                try:
-                    progress.close()
-                    progress.deleteLater()
-                    QApplication.processEvents()
-                except Exception as e:
-                    print(f"Error cleaning up progress dialog: {str(e)}")
 
-    def load_files_from_all_directories(self, progress_callback=None):
-        """Load all StepMania files from selected directories"""
+    def load_files_from_directories(self, pack_dirs):
+        """Start a background scan of the given packs; rows are appended as parsed batches arrive"""
         try:
-            self.table.setSortingEnabled(False)
-            
-            # Process existing table in chunks
-            if self.table.rowCount() > 0:
-                chunk_size = 100
-                for i in range(0, self.table.rowCount(), chunk_size):
-                    end = min(i + chunk_size, self.table.rowCount())
-                    for j in range(i, end):
-                        self.table.removeRow(i)
-                    QApplication.processEvents()
-            
-            self.table.setRowCount(0)
-            self.file_entries.clear()
+            # Entry IDs only grow, so the songs added by this load are those from this ID on
+            self.load_start_id = self.entry_counter
+            self.load_start_count = len(self.file_entries)
+            self.loading_pack_dirs = set(pack_dirs)
+            self.scan_cancelled = False
+            self.scan_started = time.monotonic()
             
             # Show UI elements
             for widget in [self.clear_button, self.bulk_edit_btn, 
                           self.search_credits_button, self.search_frame]:
                 if widget and hasattr(widget, 'show'):
                     widget.show()
+                    
+            self.load_progress_bar.setRange(0, 0)  # Busy indicator until the song folders are counted
+            self.load_progress_label.setText("Scanning packs...")
+            self.load_cancel_button.setEnabled(True)
+            self.load_progress_frame.show()
+            
+            # The manifest check lists directories into the snapshot the scan reads, so it must
+            # not run alongside it; the scan lists any folder the snapshot lacks itself
+            self.stop_manifest_check()
+            self.scan_thread = SongScanThread(pack_dirs, self.parse_workers, self.library_snapshot, self)
+            self.scan_thread.songs_found.connect(self.add_scanned_songs)
+            self.scan_thread.progress.connect(self.update_load_progress)
+            self.scan_thread.finished.connect(self.finish_loading)
+            self.scan_thread.start()
             
-            # Process files by directory
-            files_by_dir = defaultdict(list)
+        except Exception as e:
+            print(f"Error loading files: {e}")
+            traceback.print_exc()
             
-            # Find all SM/SSC files in selected directories
-            for pack_dir in self.selected_directories:
-                for song_dir in next(os.walk(pack_dir))[1]:
-                    full_song_dir = os.path.join(pack_dir, song_dir)
-                    
-                    # Get all files in directory
-                    dir_files = os.listdir(full_song_dir)
-                    
-                    # Group files by base name (case insensitive)
-                    grouped_files = {}
-                    for file in dir_files:
-                        if file.lower().endswith(tuple(SUPPORTED_EXTENSIONS)):
-                            base_name = os.path.splitext(file)[0].lower()
-                            if base_name not in grouped_files:
-                                grouped_files[base_name] = {'sm': None, 'ssc': None}
-                            
-                            full_path = os.path.join(full_song_dir, file)
-                            if file.lower().endswith('.sm'):
-                                grouped_files[base_name]['sm'] = full_path
-                            elif file.lower().endswith('.ssc'):
-                                grouped_files[base_name]['ssc'] = full_path
-                    
-                    # Process each group of files
-                    for base_name, files in grouped_files.items():
-                        sm_path = files['sm']
-                        ssc_path = files['ssc']
-                        
-                        if ssc_path:  # SSC exists
-                            ssc_metadata = MetadataUtil.read_metadata(ssc_path)
-                            if sm_path:  # Both exist
-                                files_by_dir[full_song_dir].append({
-                                    'primary_file': ssc_path,
-                                    'secondary_file': sm_path,
-                                    'metadata': ssc_metadata,
-                                    'type': 'sm+ssc'
-                                })
-                            else:  # SSC only
-                                files_by_dir[full_song_dir].append({
-                                    'primary_file': ssc_path,
-                                    'metadata': ssc_metadata,
-                                    'type': 'ssc'
-                                })
-                        elif sm_path:  # SM only
-                            sm_metadata = MetadataUtil.read_metadata(sm_path)
-                            files_by_dir[full_song_dir].append({
-                                'primary_file': sm_path,
-                                'metadata': sm_metadata,
-                                'type': 'sm'
-                            })
-                            
-            # Add files to table in chunks
-            chunk_size = 50
-            for directory, files in files_by_dir.items():
-                for i in range(0, len(files), chunk_size):
-                    chunk = files[i:i + chunk_size]
-                    for file_info in chunk:
-                        try:
-                            metadata = file_info['metadata']
-                            filepaths = [file_info['primary_file']]
-                            if 'secondary_file' in file_info:
-                                filepaths.append(file_info['secondary_file'])
-                            
-                            self.create_file_entry_with_type(
-                                filepaths=filepaths,
-                                file_type=file_info['type'],
-                                parent_dir=os.path.basename(os.path.dirname(directory)),
-                                title=metadata.get('TITLE', '').strip(),
-                                subtitle=metadata.get('SUBTITLE', '').strip(),
-                                artist=metadata.get('ARTIST', '').strip(),
-                                genre=metadata.get('GENRE', '').strip(),
-                                music_file=metadata.get('MUSIC', '')
-                            )
-                            
-                            if progress_callback:
-                                progress_callback()
-                        except Exception as e:
-                            print(f"Error creating file entry: {e}")
-                            continue
-                    QApplication.processEvents()
-            
-            self.table.setSortingEnabled(True)
-            total_count = len(self.file_entries)
-            self.update_display_count(total_count, total_count)
+    def add_scanned_songs(self, batch):
+        """Create rows for a batch of songs parsed by the scan thread"""
+        if self.scan_cancelled:
+            return  # Batch was queued before the load was cancelled
+            
+        entries = []
+        for file_info in batch:
+            try:
+                metadata = file_info['metadata']
+                filepaths = [file_info['primary_file']]
+                if 'secondary_file' in file_info:
+                    filepaths.append(file_info['secondary_file'])
+                
+                entries.append(self.new_file_entry(
+                    filepaths=filepaths,
+                    file_type=file_info['type'],
+                    parent_dir=os.path.basename(os.path.dirname(file_info['song_dir'])),
+                    title=metadata.get('TITLE', '').strip(),
+                    subtitle=metadata.get('SUBTITLE', '').strip(),
+                    artist=metadata.get('ARTIST', '').strip(),
+                    genre=metadata.get('GENRE', '').strip(),
+                    music_file=metadata.get('MUSIC', ''),
+                    assets=file_info.get('assets'),
+                    credits=file_info['credits']
+                ))
+            except Exception as e:
+                print(f"Error creating file entry: {e}")
+                continue
+                
+        # One insertion for the whole batch, with the view repainting once afterwards
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.table_model.append_entries(entries)
+        finally:
+            self.table.setUpdatesEnabled(True)
+            
+    def update_load_progress(self, done, total):
+        """Show scan progress with an ETA based on the song folders parsed so far"""
+        if self.scan_cancelled:
+            return
+        self.load_progress_bar.setRange(0, max(total, 1))
+        self.load_progress_bar.setValue(done)
+        
+        loaded = len(self.file_entries) - self.load_start_count
+        text = f"Loading songs... {loaded} loaded ({done}/{total} folders)"
+        if 0 < done < total:
+            remaining = (time.monotonic() - self.scan_started) / done * (total - done)
+            minutes = int(remaining // 60)
+            seconds = int(remaining % 60)
+            text += f", about {minutes}:{seconds:02d} left"
+        self.load_progress_label.setText(text)
+        
+    def cancel_loading(self):
+        """Stop the running scan; finish_loading drops the rows it already added"""
+        if self.scan_thread:
+            self.scan_cancelled = True
+            self.scan_thread.requestInterruption()
+            self.load_cancel_button.setEnabled(False)
+            self.load_progress_label.setText("Cancelling...")
+            
+    def finish_loading(self):
+        """Finalize a background scan once its thread has stopped"""
+        thread = self.scan_thread
+        if not thread:
+            return
+        self.scan_thread = None
+        thread.deleteLater()
+        self.load_progress_frame.hide()
+        
+        try:
+            if self.scan_cancelled:
+                # Drop the partial load so the cancelled packs can be picked again
+                self.table_model.remove_entries_from(self.load_start_id)
+                self.selected_directories -= self.loading_pack_dirs
+                # Edits made to the dropped rows while they loaded went with them
+                self.update_commit_all_button()
+                if self.table_proxy.modified_only:
+                    self.refresh_filter()
+                else:
+                    self.update_display_count(self.table_proxy.rowCount(), len(self.file_entries))
+                self.statusBar().showMessage("Loading cancelled")
+                return
+                
+            new_entries = [entry for entry in self.file_entries if entry.id >= self.load_start_id]
+            self.simfile_watcher.watch(
+                filepath for entry in new_entries for filepath in entry.filepaths
+            )
+            
+            # Fill chart columns for the new rows if any are shown
+            self.populate_chart_columns(new_entries)
+            
+            # The active search or credit filter was applied to the new rows as they were added
+            self.update_display_count(self.table_proxy.rowCount(), len(self.file_entries))
+            
+            # Persist newly parsed headers and keep the cache under its size cap
+            self.metadata_cache.prune()
+            self.statusBar().showMessage(
+                f"Loaded {len(new_entries)} songs in {time.monotonic() - self.scan_started:.1f}s"
+            )
             
         except Exception as e:
             print(f"Error loading files: {e}")
             traceback.print_exc()
 
+    def on_simfiles_changed(self, filepaths):
+        """Re-read songs whose simfiles were changed by another program"""
+        try:
+            # An sm+ssc pair can report both files; each song is re-read once
+            entries = list(dict.fromkeys(filter(None, map(self.table_model.entry_by_path, filepaths))))
+            if not entries:
+                return
+                
+            # Rows stay where they are; the proxy only re-sorts when a header is clicked
+            conflicts = 0
+            had_charts = [entry for entry in entries if entry.charts is not None]
+            for entry in entries:
+                # Pending edits win: the originals and unedited fields are re-read, what the user
+                # typed is kept, and the row is flagged if it still differs from the new file
+                metadata = MetadataUtil.read_header_cached(entry.filepaths[0])
+                entry.reload(
+                    metadata.get('TITLE', '').strip(),
+                    metadata.get('SUBTITLE', '').strip(),
+                    metadata.get('ARTIST', '').strip(),
+                    metadata.get('GENRE', '').strip(),
+                    metadata.get('MUSIC', ''),
+                    metadata.get('CREDITS', ())
+                )
+                if self.table_model.is_pending(entry) and entry.is_modified():
+                    self.table_model.conflicted_ids.add(entry.id)
+                    conflicts += 1
+                self.update_row_status(entry)
+                        
+            self.metadata_cache.flush()
+            # Chart headers and their credits are read again in the background where they were known
+            self.read_charts(entries if self.visible_chart_columns() else had_charts)
+            
+            message = f"Reloaded {len(entries)} song{'s' if len(entries) != 1 else ''} changed on disk"
+            if conflicts:
+                message += f"; unsaved edits kept on {conflicts}, flagged as conflicts"
+            print(message)
+            self.statusBar().showMessage(message)
+            
+        except Exception as e:
+            print(f"Error refreshing changed files: {str(e)}")
+            traceback.print_exc()
+            
+    def schedule_search(self):
+        """Search once typing pauses, dropping a search pass that is still running"""
+        self.table_proxy.cancel_filter()
+        self.running_search = None
+        self.search_timer.start()
+
     def apply_search_filter(self):
         """Apply search filter to table entries"""
-        search_text = self.search_box.text().lower()
-        shown_count = 0
-        total_count = len(self.file_entries)
-        
-        # If search is empty, show all rows and update count
-        if not search_text:
-            for row in range(self.table.rowCount()):
-                self.table.setRowHidden(row, False)
-            self.update_display_count(total_count, total_count)
+        self.search_timer.stop()
+        query = SongQuery.compile(self.search_box.text())
+        
+        # If search is empty, show all rows
+        if not query.text:
+            self.applied_search = self.running_search = None
+            self.table_proxy.set_filter(None)
+            self.update_display_count(self.table_proxy.rowCount(), len(self.file_entries))
             return
-        
-        # For each row in the table
-        for row in range(self.table.rowCount()):
-            # Get searchable text from table items
-            searchable_fields = []
             
-            # Parent directory (Pack) - column 3
-            pack_item = self.table.item(row, 3)
-            if pack_item:
-                searchable_fields.append(pack_item.text())
-                
-            # Title - column 4
-            title_item = self.table.item(row, 4)
-            if title_item:
-                searchable_fields.append(title_item.text())
-                
-            # Subtitle - column 5
-            subtitle_item = self.table.item(row, 5)
-            if subtitle_item:
-                searchable_fields.append(subtitle_item.text())
+        # .ssc chart credits are read on the first credit: query; it runs again once they are in
+        if 'credits' in query.fields and self.apply_search_filter not in self.chart_callbacks:
+            if any(entry.lacks_chart_credits() for entry in self.file_entries):
+                self.with_chart_credits(self.apply_search_filter)
                 
-            # Artist - column 6
-            artist_item = self.table.item(row, 6)
-            if artist_item:
-                searchable_fields.append(artist_item.text())
-                
-            # Genre - column 7
-            genre_item = self.table.item(row, 7)
-            if genre_item:
-                searchable_fields.append(genre_item.text())
-            
-            # Combine all fields and search
-            searchable_text = ' '.join(searchable_fields).lower()
-            hide_row = search_text not in searchable_text
-            
-            self.table.setRowHidden(row, hide_row)
-            if not hide_row:
-                shown_count += 1
-        
-        # Update display count after filtering
-        self.update_display_count(shown_count, total_count)
-
-    def get_column_index(self, field):
-        """Helper method to get column index for a field"""
-        column_map = {
-            'title': 4,
-            'subtitle': 5,
-            'artist': 6,
-            'genre': 7
-        }
-        return column_map.get(field, 0)
-    
+        # Search the pack, title, subtitle, artist, genre and credits of each song, joined and casefolded once
+        haystack = self.table_model.haystack
+        if query.plain is None:
+            # Several terms, field scoping, negation, quotes or OR: run the compiled query, testing only the
+            # songs the trigram index says can match when it has a required term to look up
+            matches = query.matches
+            predicate = lambda entry: matches(entry, haystack(entry))
+            entry_ids = query.candidate_keys(self.table_model.search_index)
+            rows = None if entry_ids is None else self.table_model.rows_of_ids(entry_ids)
+            self.running_search = (None, predicate, self.table_model.revision)
+            self.table_proxy.start_filter(predicate, rows)
+            return
+            
+        search_text = query.plain
+        predicate = lambda entry: search_text in haystack(entry)
+        
+        last = self.applied_search
+        if len(search_text) >= TrigramIndex.N:
+            # The trigram index finds the matching rows; the pass only applies them
+            rows = self.table_model.search_rows(search_text)
+        elif (last is not None and last[0] is not None and last[0] in search_text
+              and last[1] is self.table_proxy.predicate and last[2] == self.table_model.revision):
+            # A query containing the shown one can only match songs it matched, so only those are
+            # re-tested, unless songs were edited or another filter was applied since
+            rows = list(self.table_proxy.source_rows)
+        else:
+            rows = None  # Too short for the index: test every song
+        self.running_search = (search_text, predicate, self.table_model.revision)
+        self.table_proxy.start_filter(predicate, rows)
+        
+    def on_search_finished(self):
+        """Record the search now shown and update the display count"""
+        if self.running_search and self.running_search[1] is self.table_proxy.predicate:
+            self.applied_search = self.running_search
+        self.running_search = None
+        self.update_display_count(self.table_proxy.rowCount(), len(self.file_entries))
+
+    def toggle_modified_only(self):
+        """Toggle showing only songs with uncommitted changes"""
+        enabled = not self.table_proxy.modified_only
+        self.modified_only_btn.setText(f"Modified Only: {'ON' if enabled else 'OFF'}")
+        self.table_proxy.set_modified_only(enabled)
+        self.update_display_count(self.table_proxy.rowCount(), len(self.file_entries))
+        
+    def refresh_filter(self):
+        """Re-apply the current filter, e.g. after committing hides rows from the modified-only view"""
+        self.table_proxy.refilter()
+        self.update_display_count(self.table_proxy.rowCount(), len(self.file_entries))
+
     def toggle_bulk_edit(self):
         """Toggle bulk edit mode"""
         self.bulk_edit_enabled = not self.bulk_edit_enabled
@@ -1469,19 +2481,19 @@ class MetadataEditor(QMainWindow):
             self.bulk_edit_btn.setText("Exit Bulk Edit")
             self.bulk_edit_controls.show()
             # Disable direct editing of cells during bulk edit
-            self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+            self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         else:
             self.bulk_edit_btn.setText("Bulk Edit: OFF")
             self.bulk_edit_controls.hide()
             # Re-enable direct editing
-            self.table.setEditTriggers(QTableWidget.EditTrigger.AllEditTriggers)
+            self.table.setEditTriggers(QTableView.EditTrigger.AllEditTriggers)
             self.table.clearSelection()
 
     def apply_bulk_edit(self):
         """Apply bulk edits to selected rows"""
-        selected_rows = set(item.row() for item in self.table.selectedItems())
+        selected_entries = self.get_selected_entries()
         
-        if not selected_rows:
+        if not selected_entries:
             return
         
         # Get values from bulk edit fields
@@ -1491,24 +2503,11 @@ class MetadataEditor(QMainWindow):
             'genre': self.bulk_fields['genre'].text()
         }
         
-        # Apply to each selected row
-        for row in selected_rows:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                continue
-            
-            # Find the entry in backend data using ID
-            entry_id = id_item.text()
-            entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-            
-            if entry:
-                for field, value in new_values.items():
-                    if value:  # Only update if value is not empty
-                        col_index = self.get_column_index(field)
-                        item = QTableWidgetItem(value)
-                        self.table.setItem(row, col_index, item)
-                        self.on_entry_change(row, entry['filepaths'], field)
+        # Apply to each selected song through the model, as if typed into the table
+        for entry in selected_entries:
+            for field, value in new_values.items():
+                if value:  # Only update if value is not empty
+                    self.table_model.set_field(entry, field, value)
 
     def toggle_shazam_mode(self):
         """Toggle Shazam mode on/off"""
@@ -1584,46 +2583,27 @@ class MetadataEditor(QMainWindow):
                 }
             """)
 
-    def show_shazam_results(self, row, shazam_data):
-        """Display Shazam results for a row"""
+    def show_shazam_results(self, entry_id, shazam_data):
+        """Display Shazam results for a song"""
         if not self.shazam_mode:
             return
         
         try:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                return
-            
-            # Find the entry using ID instead of row
-            entry_id = id_item.text()
-            entry_data = next((e for e in self.file_entries if e['id'] == entry_id), None)
+            entry_data = self.table_model.entry_by_id(entry_id)
             if not entry_data:
                 return
 
-            # Initialize metadata dictionary if it doesn't exist
-            if 'metadata' not in entry_data:
-                entry_data['metadata'] = {}
-
-            # Store widgets temporarily to prevent deletion
-            self.temp_widgets = []
-            
-            # Column mapping
-            col_map = {
-                'title': 4,
-                'artist': 6,
-                'genre': 7
-            }
+            # Initialize Shazam values dictionary if it doesn't exist
+            if entry_data.shazam is None:
+                entry_data.shazam = {}
             
             print(f"Processing Shazam data: {shazam_data}")
             
-            # Create suggestion buttons for each field
+            # Record a suggestion for each field; the row shows them as buttons while it's on screen
             for field in ['title', 'artist', 'genre']:
                 if field in shazam_data and shazam_data[field]:
                     try:
-                        col_index = col_map[field]
-                        current_item = self.table.item(row, col_index)
-                        current_value = current_item.text() if current_item else ''
+                        current_value = entry_data.get(field)
                         
                         # Escape special characters in the Shazam value
                         new_value = str(shazam_data[field])
@@ -1635,188 +2615,56 @@ class MetadataEditor(QMainWindow):
                         )
                         
                         if current_value.lower() == escaped_new_value.lower():
-                            # Values match - show green confirmation but keep field editable
-                            item = QTableWidgetItem(current_value)
-                            item.setBackground(QColor("#f0fff0"))  # Light green background
-                            self.table.setItem(row, col_index, item)
-                            entry_data['metadata'][field] = current_value  # Store current value
+                            # Values match - shown green but kept editable
+                            entry_data.shazam[field] = current_value  # Store current value
+                            self.table_model.clear_suggestion(entry_data, field)
                         else:
-                            # Create container widget
-                            container = QWidget()
-                            layout = QVBoxLayout(container)
-                            layout.setContentsMargins(4, 4, 4, 4)
-                            layout.setSpacing(4)
-
-                            # Create suggestion button
-                            suggest_btn = QPushButton()
-                            
-                            # Add right-click functionality
-                            suggest_btn.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-                            suggest_btn.customContextMenuRequested.connect(
-                                lambda pos, r=row, f=field, v=current_value:
-                                self.reject_shazam_value(r, f, v)
-                            )
-
-                            # Keep all the existing styling and setup exactly as is
-                            suggest_btn.setStyleSheet("""
-                                QPushButton {
-                                    background-color: #4a90e2;
-                                    color: white;
-                                    border: none;
-                                    border-radius: 4px;
-                                    padding: 8px;
-                                    text-align: left;
-                                    min-height: 50px;
-                                }
-                                QPushButton:hover {
-                                    background-color: #357abd;
-                                }
-                            """)
-
-                            # Create layout for button content
-                            btn_layout = QVBoxLayout(suggest_btn)
-                            btn_layout.setContentsMargins(4, 4, 4, 4)
-                            btn_layout.setSpacing(2)
-                            
-                            # Add current and new value labels
-                            current_label = QLabel(f"Current: {current_value}")
-                            current_label.setStyleSheet("color: #ccc; font-size: 9pt;")
-                            new_label = QLabel(f"New: {escaped_new_value}")
-                            new_label.setStyleSheet("color: white; font-size: 10pt; font-weight: bold;")
-                            
-                            btn_layout.addWidget(current_label)
-                            btn_layout.addWidget(new_label)
-
-                            suggest_btn.clicked.connect(
-                                lambda checked, r=row, f=field, v=escaped_new_value:
-                                self.apply_shazam_value(r, f, v)
-                            )
-                            
-                            layout.addWidget(suggest_btn)
-                            self.table.setCellWidget(row, col_index, container)
-                            self.temp_widgets.append(container)
-                            
-                            # Set row height to accommodate the taller button
-                            self.table.setRowHeight(row, 70)
+                            self.table_model.set_suggestion(entry_data, field, current_value, escaped_new_value)
 
                     except Exception as e:
                         print(f"Error processing field {field}: {str(e)}")
                         traceback.print_exc()
                         continue
 
-            # Add artwork button if available
+            # Offer the artwork comparison if Shazam found cover art
             if 'images' in shazam_data and 'coverart' in shazam_data['images']:
-                # Check if actions widget exists
-                actions_widget = self.table.cellWidget(row, 1)
-                if actions_widget:
-                    actions_layout = actions_widget.layout()
-                    
-                    # Check if artwork button already exists
-                    artwork_btn_exists = False
-                    for i in range(actions_layout.count()):
-                        widget = actions_layout.itemAt(i).widget()
-                        if isinstance(widget, QPushButton) and widget.text() == "📸":
-                            artwork_btn_exists = True
-                            break
-                    
-                    # Only create new button if it doesn't exist
-                    if not artwork_btn_exists:
-                        artwork_btn = QPushButton("📸")
-                        artwork_btn.setToolTip("Compare Artwork")
-                        artwork_btn.setMinimumWidth(30)
-                        artwork_btn.clicked.connect(
-                            lambda: self.compare_artwork(
-                                row,
-                                shazam_data['images']['coverart'],
-                                os.path.dirname(entry_data['filepaths'][0])
-                            )
-                        )
-                        artwork_btn.setStyleSheet("""
-                            QPushButton {
-                                background-color: #4a90e2;
-                                color: white;
-                                border: none;
-                                border-radius: 4px;
-                                padding: 4px 8px;
-                            }
-                            QPushButton:hover {
-                                background-color: #357abd;
-                            }
-                        """)
-                        
-                        # Add to actions cell before the stretch
-                        actions_layout.insertWidget(3, artwork_btn)
+                self.table_model.artwork_urls[entry_data.id] = shazam_data['images']['coverart']
+                
+            self.table_model.refresh_entry(entry_data)
+            self.update_suggestion_row(entry_data)
                         
         except Exception as e:
             print(f"Error in show_shazam_results: {str(e)}")
             traceback.print_exc()
 
-    def apply_shazam_value(self, row, field, value):
+    def apply_shazam_value(self, entry_id, field, value):
         """Apply a Shazam suggestion to a field"""
         try:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                return
-            
-            # Find the entry using ID instead of row
-            entry_id = id_item.text()
-            entry_data = next((e for e in self.file_entries if e['id'] == entry_id), None)
+            entry_data = self.table_model.entry_by_id(entry_id)
             if not entry_data:
                 print(f"Warning: Could not find entry data for ID {entry_id}")
                 return
-            
-            # Find the current row for this ID (in case table was sorted)
-            current_row = self.find_row_by_id(entry_id)
-            if current_row == -1:
-                return
-            
-            # Use current_row instead of row parameter from here on
-            row = current_row
 
-            # Value is already escaped when passed from show_shazam_results
-            escaped_value = str(value).strip()
-
-            # Map field names to column indices
-            col_map = {
-                'title': 4,
-                'artist': 6,
-                'genre': 7
-            }
-            
-            col_index = col_map.get(field)
-            if col_index is None:
+            if field not in SongTableModel.EDITABLE_COLUMNS.values():
                 print(f"Warning: Invalid field name: {field}")
                 return
 
-            # Get current value
-            current_item = self.table.item(row, col_index)
-            current_value = current_item.text() if current_item else ""
+            # Value is already escaped when passed from show_shazam_results
+            escaped_value = str(value).strip()
+            self.table_model.clear_suggestion(entry_data, field)
 
             # Only mark as changed if the value is different
-            if current_value != escaped_value:
-                # Create new editable table item with the escaped value
-                new_item = QTableWidgetItem(escaped_value)
-                new_item.setForeground(QColor("#FF8C00"))  # Dark orange
-                new_item.setFlags(new_item.flags() | Qt.ItemFlag.ItemIsEditable)
-                
-                # Remove the button container and set the new editable item
-                self.table.removeCellWidget(row, col_index)
-                self.table.setItem(row, col_index, new_item)
-                
-                # Update metadata
-                if 'metadata' not in entry_data:
-                    entry_data['metadata'] = {}
-                entry_data['metadata'][field] = escaped_value
+            if entry_data.get(field) != escaped_value:
+                # Update Shazam values; the accepted value is shown in orange until committed
+                if entry_data.shazam is None:
+                    entry_data.shazam = {}
+                entry_data.shazam[field] = escaped_value
                 
-                # Update commit button and status
-                self.update_row_status(row, entry_data['filepaths'])
-                
-                # Update the commit all button
-                self.update_commit_all_button()
+                # Edit through the model, which updates the status and commit cells
+                self.table_model.set_field(entry_data, field, escaped_value)
             
-            # Check for remaining suggestions and update row height
-            self.check_remaining_suggestions(row, col_index)
+            # Shrink the row once no suggestions are left
+            self.update_suggestion_row(entry_data)
             
         except Exception as e:
             print(f"Error applying Shazam value: {str(e)}")
@@ -1835,9 +2683,16 @@ class MetadataEditor(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
+            if self.scan_thread:
+                self.cancel_loading()
+                self.scan_thread.wait()
+                self.finish_loading()
+            self.stop_chart_scan()
             self.selected_directories.clear()
-            self.table.setRowCount(0)
-            self.file_entries.clear()
+            self.library_snapshot = LibrarySnapshot()
+            self.simfile_watcher.clear()
+            self.table_model.clear()
+            self.update_commit_all_button()
             
             # Hide buttons that should only show when files are loaded
             # Only hide widgets that exist
@@ -1855,7 +2710,7 @@ class MetadataEditor(QMainWindow):
 
             
     def sort_table(self, column):
-        """Sort table by clicked column header"""
+        """Sort table by clicked column header; Shift+click adds the column as a tie-breaker"""
         try:
             # Only handle sortable columns
             if column not in [3, 4, 5, 6, 7]:  # pack, title, subtitle, artist, genre
@@ -1865,70 +2720,25 @@ class MetadataEditor(QMainWindow):
             field_map = {3: 'pack', 4: 'title', 5: 'subtitle', 6: 'artist', 7: 'genre'}
             field = field_map[column]
             
-            # Store widgets and their states before sorting
-            stored_widgets = {}
-            for row in range(self.table.rowCount()):
-                id_item = self.table.item(row, self.COL_ID)
-                if id_item:
-                    entry_id = id_item.text()
-                    commit_widget = self.table.cellWidget(row, self.COL_COMMIT)
-                    status_widget = self.table.cellWidget(row, self.COL_STATUS)
-                    
-                    if commit_widget:
-                        commit_btn = commit_widget.findChild(QPushButton)
-                        if commit_btn:
-                            stored_widgets[entry_id] = {
-                                'commit': commit_btn.isEnabled(),
-                                'status': status_widget,
-                                'filepaths': next((e['filepaths'] for e in self.file_entries if e['id'] == entry_id), None)
-                            }
-            
             self.sort_reverse[field] = not self.sort_reverse[field]
+            order = Qt.SortOrder.AscendingOrder if not self.sort_reverse[field] else Qt.SortOrder.DescendingOrder
             
-            # Temporarily enable sorting
-            self.table.setSortingEnabled(True)
-            
-            # Sort using Qt's built-in functionality
-            self.table.sortItems(column, Qt.SortOrder.AscendingOrder if not self.sort_reverse[field] 
-                                    else Qt.SortOrder.DescendingOrder)
-            
-            # Immediately disable sorting after the sort is complete
-            self.table.setSortingEnabled(False)
-            
-            # Restore widgets and their states
-            for row in range(self.table.rowCount()):
-                id_item = self.table.item(row, self.COL_ID)
-                if id_item:
-                    entry_id = id_item.text()
-                    if entry_id in stored_widgets:
-                        widget_data = stored_widgets[entry_id]
-                        
-                        # Recreate commit button if it was enabled
-                        if widget_data['commit'] and widget_data['filepaths']:
-                            commit_container = QWidget()
-                            commit_layout = QHBoxLayout(commit_container)
-                            commit_layout.setContentsMargins(0, 0, 0, 0)
-                            
-                            commit_btn = QPushButton("Commit?")
-                            commit_btn.setEnabled(True)
-                            # Use entry_id instead of row for the commit action
-                            commit_btn.clicked.connect(
-                                lambda checked, eid=entry_id, fps=widget_data['filepaths']: 
-                                self.commit_changes(self.find_row_by_id(eid), fps)
-                            )
-                            commit_layout.addWidget(commit_btn)
-                            self.table.setCellWidget(row, self.COL_COMMIT, commit_container)
-                        
-                        # Restore status widget if it exists
-                        if widget_data['status']:
-                            self.table.setCellWidget(row, self.COL_STATUS, widget_data['status'])
-            
-            # Update file_entries row references
-            for entry in self.file_entries:
-                for row in range(self.table.rowCount()):
-                    if self.table.item(row, 3) and entry['original_values'].get('pack') == self.table.item(row, 3).text():
-                        entry['row'] = row
-                        break
+            if QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier:
+                columns = [col for col, _ in self.sort_columns]
+                if column in columns:
+                    self.sort_columns[columns.index(column)] = (column, order)
+                else:
+                    self.sort_columns.append((column, order))
+            else:
+                self.sort_columns = [(column, order)]
+            
+            # The model reorders its records; status, commit and suggestion state follow them
+            self.table_model.sort_by(self.sort_columns)
+            self.table.horizontalHeader().setSortIndicator(column, order)
+            if len(self.sort_columns) > 1:
+                self.statusBar().showMessage(
+                    "Sorted by " + ", then ".join(SongTableModel.HEADERS[col] for col, _ in self.sort_columns)
+                )
                         
         except Exception as e:
             print(f"Sort error: {str(e)}")
@@ -1939,7 +2749,7 @@ class MetadataEditor(QMainWindow):
         dialog = HelpDialog(self)
         dialog.exec()
 
-    def show_artwork_preview(self, row, artwork_url):
+    def show_artwork_preview(self, entry_id, artwork_url):
         """Show artwork preview dialog with option to save"""
         try:
             # Download image
@@ -1972,7 +2782,7 @@ class MetadataEditor(QMainWindow):
             button_layout = QHBoxLayout(button_frame)
             
             save_btn = QPushButton("Save Artwork")
-            save_btn.clicked.connect(lambda: self.save_artwork(row, image))
+            save_btn.clicked.connect(lambda: self.save_artwork(entry_id, image))
             button_layout.addWidget(save_btn)
             
             close_btn = QPushButton("Close")
@@ -1985,64 +2795,36 @@ class MetadataEditor(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load artwork: {str(e)}")
             
-    def save_artwork(self, row, image):
+    def save_artwork(self, entry_id, image):
         """Save artwork to song directory and update JACKET metadata"""
         try:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                print("Error: No ID found for row", row)
-                return False
-                
-            # Find the entry using ID instead of row
-            entry_id = id_item.text()
-            entry_data = next((e for e in self.file_entries if e['id'] == entry_id), None)
+            entry_data = self.table_model.entry_by_id(entry_id)
             if not entry_data:
                 print(f"Error: Could not find entry data for ID {entry_id}")
                 return False
                
-            directory = os.path.dirname(entry_data['filepaths'][0])
+            directory = os.path.dirname(entry_data.filepaths[0])
             if not directory or not os.path.exists(directory):
                 print(f"Error: Invalid directory for ID {entry_id}")
                 return False
             
-            # Look for existing jacket file
-            existing_jacket = None
-            for file in os.listdir(directory):
-                if 'jacket' in file.lower() and file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    existing_jacket = file
-                    break
-            
-            # Use existing jacket name or default
-            jacket_filename = existing_jacket if existing_jacket else 'jacket.png'
+            # Use the existing jacket file name or default
+            jacket_files = self.get_song_assets(entry_data).jacket_files
+            jacket_filename = jacket_files[0] if jacket_files else 'jacket.png'
             output_path = os.path.join(directory, jacket_filename)
             image.save(output_path)
+            self.library_snapshot.refresh(directory)
+            entry_data.assets = None  # Re-indexed on next use, with the new JACKET value
             
             # Update metadata in all associated files
-            for filepath in entry_data['filepaths']:
-                content, encoding = MetadataUtil.read_file_with_encoding(filepath)
-                if not content:
+            for filepath in entry_data.filepaths:
+                document = SimfileDocument.load(filepath)
+                if not document:
                     continue
                 
-                jacket_line_exists = False
-                
-                # Check if JACKET field exists
-                for i, line in enumerate(content):
-                    if line.startswith('#JACKET:'):
-                        content[i] = f'#JACKET:{jacket_filename};\n'
-                        jacket_line_exists = True
-                        break
-                
-                # If JACKET doesn't exist, add it after TITLE
-                if not jacket_line_exists:
-                    for i, line in enumerate(content):
-                        if line.startswith('#TITLE:'):
-                            content.insert(i + 1, f'#JACKET:{jacket_filename};\n')
-                            break
-                
-                # Write back to file
-                with open(filepath, 'w', encoding=encoding) as file:
-                    file.writelines(content)
+                # Update JACKET, or add it after TITLE if it doesn't exist
+                document.set('JACKET', jacket_filename)
+                document.save()
             
             print(f"Successfully saved artwork to {output_path}")
             QMessageBox.information(self, "Success", "Artwork Updated")
@@ -2055,57 +2837,47 @@ class MetadataEditor(QMainWindow):
             QMessageBox.warning(self, "Error", error_msg)
             return False
 
-    def create_action_buttons(self, row, filepaths, music_file='', entry_id=None):
-        """Create action buttons for a table row"""
-        action_widget = QWidget()
-        action_layout = QHBoxLayout(action_widget)
-        action_layout.setContentsMargins(2, 2, 2, 2)
-        action_layout.setSpacing(5)
-        
-        # Open folder button
-        folder_btn = QToolButton()
-        folder_btn.setText("📁")
-        folder_btn.setMinimumWidth(30)
-        folder_btn.clicked.connect(
-            lambda: self.open_file_location(os.path.dirname(filepaths[0])))
-        action_layout.addWidget(folder_btn)
-        
-        # Play button
-        play_btn = QToolButton()
-        play_btn.setText("▶️")
-        play_btn.setMinimumWidth(30)
-        if music_file:
-            # Create the full music path
-            music_path = os.path.join(os.path.dirname(filepaths[0]), music_file)
-            
-            # Simple lambda without default arguments
-            play_btn.clicked.connect(
-                lambda checked, mp=music_path, pb=play_btn, eid=entry_id: 
-                self.play_audio(mp, pb, eid)
+    def on_row_action(self, action, entry):
+        """Handle a click on one of a row's painted action buttons"""
+        if action == 'folder':
+            self.open_file_location(os.path.dirname(entry.filepaths[0]))
+        elif action == 'play':
+            self.play_audio(entry.id)
+        elif action == 'edit':
+            self.edit_metadata(entry.filepaths)
+        elif action == 'artwork':
+            self.compare_artwork(
+                entry.id, self.table_model.artwork_urls[entry.id], os.path.dirname(entry.filepaths[0])
             )
+
+    def update_suggestion_row(self, entry):
+        """Enlarge a song's row while it has Shazam suggestions, restoring it once they are decided"""
+        row = self.find_row_by_id(entry.id)
+        if row == -1:
+            return
+        if entry.id in self.table_model.suggestions:
+            height = SuggestionDelegate.ROW_HEIGHT
         else:
-            play_btn.setEnabled(False)
-            play_btn.setToolTip("No audio file found")
-        action_layout.addWidget(play_btn)
-        
-        # Edit button
-        edit_btn = QToolButton()
-        edit_btn.setText("✏️")
-        edit_btn.setMinimumWidth(30)
-        edit_btn.clicked.connect(lambda: self.edit_metadata(filepaths))  # Changed to edit_metadata
-        action_layout.addWidget(edit_btn)
-        
-        return action_widget
+            height = self.table.verticalHeader().defaultSectionSize()
+        if self.table.rowHeight(row) != height:
+            self.table.setRowHeight(row, height)
+            
+    def update_suggestion_rows(self):
+        for entry_id in list(self.table_model.suggestions):
+            entry = self.table_model.entry_by_id(entry_id)
+            if entry:
+                self.update_suggestion_row(entry)
 
     def cleanup_audio(self):
         """Clean up audio resources"""
-        if self.current_playing:
+        if self.playing_id is not None:
+            self.playing_id = None
             try:
                 pygame.mixer.music.stop()
-                self.current_playing.setText("▶")
-                self.current_playing = None
             except Exception as e:
                 print(f"Error cleaning up audio: {str(e)}")
+            self.table_model.play_states.clear()
+            self.table_model.refresh_columns([self.COL_ACTIONS])
 
     def closeEvent(self, event):
         """Handle cleanup when window is closed"""
@@ -2121,8 +2893,13 @@ class MetadataEditor(QMainWindow):
         pygame.quit()
         
         # Cleanup any remaining resources
+        for thread in (self.scan_thread, self.manifest_thread, self.chart_thread):
+            if thread:
+                thread.requestInterruption()
+                thread.wait()
         if self.loop:
             self.loop.close()
+        self.metadata_cache.close()
         
         event.accept()
 
@@ -2136,31 +2913,10 @@ class MetadataEditor(QMainWindow):
         except:
             pass
 
-    def check_remaining_suggestions(self, row, current_col):
-        """Check if there are any remaining suggestion buttons in the row"""
-        has_suggestions = False
-        for col in [4, 6, 7]:  # title, artist, genre columns
-            if col != current_col:
-                widget = self.table.cellWidget(row, col)
-                if widget and isinstance(widget, QWidget):
-                    has_suggestions = True
-                    break
-        
-        if not has_suggestions:
-            self.table.setRowHeight(row, self.table.verticalHeader().defaultSectionSize())
-
-    def compare_artwork(self, row, shazam_url, song_directory):
+    def compare_artwork(self, entry_id, shazam_url, song_directory):
         """Compare local artwork with Shazam artwork"""
         try:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                print("Error: No ID found for row", row)
-                return
-                
-            # Find the entry using ID instead of row
-            entry_id = id_item.text()
-            entry_data = next((e for e in self.file_entries if e['id'] == entry_id), None)
+            entry_data = self.table_model.entry_by_id(entry_id)
             if not entry_data:
                 print(f"Error: Could not find entry data for ID {entry_id}")
                 return
@@ -2181,33 +2937,19 @@ class MetadataEditor(QMainWindow):
             left_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
             
             # Get JACKET value from metadata
-            metadata = MetadataUtil.read_metadata(entry_data['filepaths'][0])
+            metadata = MetadataUtil.read_header(entry_data.filepaths[0])
             jacket_ref = metadata.get('JACKET', '').strip()
             local_image = None
             current_jacket_ref = None
 
-            if jacket_ref:
-                # Try to find any file containing the jacket name (without extension)
-                search_term = os.path.splitext(jacket_ref)[0].lower()
-                for file in os.listdir(song_directory):
-                    if search_term in file.lower() and file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        try:
-                            local_image = Image.open(os.path.join(song_directory, file))
-                            current_jacket_ref = file
-                            break
-                        except Exception as e:
-                            print(f"Failed to load file containing {search_term}: {str(e)}")
-
-            # If no image found from JACKET reference, look for any file with "jacket" in the name
-            if not local_image:
-                for file in os.listdir(song_directory):
-                    if 'jacket' in file.lower() and file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        try:
-                            local_image = Image.open(os.path.join(song_directory, file))
-                            current_jacket_ref = file
-                            break
-                        except Exception as e:
-                            print(f"Failed to load jacket file: {str(e)}")
+            # Images matching the JACKET reference come first, then any file with "jacket" in the name
+            for file in self.get_song_assets(entry_data).jacket_candidates:
+                try:
+                    local_image = Image.open(os.path.join(song_directory, file))
+                    current_jacket_ref = file
+                    break
+                except Exception as e:
+                    print(f"Failed to load jacket file {file}: {str(e)}")
             
 
             
@@ -2258,7 +3000,7 @@ class MetadataEditor(QMainWindow):
                 button_layout.addWidget(keep_btn)
                 
                 update_btn = QPushButton("Update Artwork")
-                update_btn.clicked.connect(lambda: self.handle_artwork_update(dialog, row, shazam_image))
+                update_btn.clicked.connect(lambda: self.handle_artwork_update(dialog, entry_id, shazam_image))
                 button_layout.addWidget(update_btn)
                 
                 dialog.exec()
@@ -2274,16 +3016,18 @@ class MetadataEditor(QMainWindow):
             print(error_msg)
             traceback.print_exc()
 
-    def handle_artwork_update(self, dialog, row, image):
+    def handle_artwork_update(self, dialog, entry_id, image):
         """Handle artwork update and dialog closing"""
-        if self.save_artwork(row, image):
+        if self.save_artwork(entry_id, image):
             dialog.accept()  # Close the dialog only if save was successful
 
     def check_playback(self):
         """Check if playback has ended and reset button state"""
-        if self.current_playing and not pygame.mixer.music.get_busy():
-            self.current_playing.setText("▶")
-            self.current_playing = None
+        if self.playing_id is not None and not pygame.mixer.music.get_busy():
+            entry = self.table_model.entry_by_id(self.playing_id)
+            self.playing_id = None
+            if entry:
+                self.table_model.set_play_state(entry, '')
 
     def edit_metadata(self, filepaths):
         """Open the metadata editor dialog"""
@@ -2296,76 +3040,13 @@ class MetadataEditor(QMainWindow):
             print(f"Error opening metadata editor: {str(e)}")
             traceback.print_exc()
 
-    def update_row_status(self, row, filepaths):
-        """Update the status and commit columns for a row"""
+    def update_row_status(self, entry):
+        """Refresh the status and commit cells of a song's row"""
         try:
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                return
-                
-            # Find the entry in backend data using ID
-            entry_id = id_item.text()
-            entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-            if not entry:
-                return
-
-            # Check if any values have changed
-            has_changes = False
-            for col, field in [
-                (self.COL_TITLE, 'title'),
-                (self.COL_SUBTITLE, 'subtitle'),
-                (self.COL_ARTIST, 'artist'),
-                (self.COL_GENRE, 'genre')
-            ]:
-                item = self.table.item(row, col)
-                if item and item.text() != entry['original_values'][field]:
-                    has_changes = True
-                    break
-
-            # Update status column
-            if has_changes:
-                status_label = QLabel("⚠")
-                status_label.setStyleSheet("color: #FF8C00;")  # Dark orange
-                status_label.setToolTip("Unsaved changes")
-                
-                status_container = QWidget()
-                status_layout = QHBoxLayout(status_container)
-                status_layout.setContentsMargins(0, 0, 0, 0)
-                status_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                status_layout.addWidget(status_label)
+            self.table_model.update_pending(entry)
                 
-                self.table.setCellWidget(row, 8, status_container)
-
-                # Create commit button
-                commit_container = QWidget()
-                commit_layout = QHBoxLayout(commit_container)
-                commit_layout.setContentsMargins(2, 2, 2, 2)
-                
-                commit_btn = QPushButton("Commit")
-                commit_btn.setObjectName("commitButton")
-                commit_btn.clicked.connect(lambda: self.commit_changes(row, filepaths))
-                commit_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #4a90e2;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        padding: 4px 8px;
-                        min-width: 60px;
-                    }
-                    QPushButton:hover {
-                        background-color: #357abd;
-                    }
-                """)
-                commit_layout.addWidget(commit_btn)
-                self.table.setCellWidget(row, 9, commit_container)
-            else:
-                # Clear status and commit columns if no changes
-                self.table.removeCellWidget(row, 8)  # Status column
-                self.table.removeCellWidget(row, 9)  # Commit column
-                self.table.setItem(row, 8, QTableWidgetItem(""))
-                self.table.setItem(row, 9, QTableWidgetItem(""))
+            # Both cells are derived from the record by the model
+            self.table_model.refresh_entry(entry)
 
             # Update commit all button
             self.update_commit_all_button()
@@ -2381,56 +3062,11 @@ class MetadataEditor(QMainWindow):
         
         # Show all rows
         total_count = len(self.file_entries)
-        for row in range(self.table.rowCount()):
-            self.table.setRowHidden(row, False)
+        self.table_proxy.set_filter(None)
             
         # Update display count to show all entries
         self.update_display_count(total_count, total_count)
 
-    def on_cell_changed(self, row, col):
-        """Handle cell value changes"""
-        try:
-            # Only process editable columns
-            if col not in [self.COL_TITLE, self.COL_SUBTITLE, self.COL_ARTIST, self.COL_GENRE]:
-                return
-                
-            # Get the ID from the current row
-            id_item = self.table.item(row, self.COL_ID)
-            if not id_item:
-                return
-                
-            # Find the entry in backend data using ID
-            entry_id = id_item.text()
-            entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-            if not entry:
-                return
-                
-            # Map column to field name
-            col_to_field = {
-                self.COL_TITLE: 'title',
-                self.COL_SUBTITLE: 'subtitle',
-                self.COL_ARTIST: 'artist',
-                self.COL_GENRE: 'genre'
-            }
-            
-            field = col_to_field.get(col)
-            if not field:
-                return
-                
-            # Get the new value
-            item = self.table.item(row, col)
-            if not item:
-                return
-                
-            # Check if value has changed from original
-            if item.text() != entry['original_values'][field]:
-                # Update status and commit columns
-                self.update_row_status(row, entry['filepaths'])
-                
-        except Exception as e:
-            print(f"Error in on_cell_changed: {str(e)}")
-            traceback.print_exc()
-
     def update_display_count(self, shown_count, total_count):
         """Update the display count indicator"""
         # Get unique pack names by taking the basename of each directory
@@ -2443,35 +3079,19 @@ class MetadataEditor(QMainWindow):
         # Always show the frame, even when counts are equal
         self.display_count_frame.show()
 
-    def reject_shazam_value(self, row, field, original_value):
+    def reject_shazam_value(self, entry_id, field, original_value):
         """Reject a Shazam suggestion and restore the original value"""
         try:
-            col_map = {
-                'title': 4,
-                'artist': 6,
-                'genre': 7
-            }
-            
-            col_index = col_map.get(field)
-            if col_index is None:
+            entry_data = self.table_model.entry_by_id(entry_id)
+            if not entry_data or field not in SongTableModel.EDITABLE_COLUMNS.values():
                 return
 
-            # Create new item with original value
-            item = QTableWidgetItem(original_value)
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
-            
             # Remove suggestion and restore original value
-            self.table.removeCellWidget(row, col_index)
-            self.table.setItem(row, col_index, item)
-            
-            # Reset row height if no more suggestions
-            has_suggestions = False
-            for col in [4, 6, 7]:  # title, artist, genre columns
-                if isinstance(self.table.cellWidget(row, col), QWidget):
-                    has_suggestions = True
-                    break
-            if not has_suggestions:
-                self.table.setRowHeight(row, self.table.verticalHeader().defaultSectionSize())
+            self.table_model.clear_suggestion(entry_data, field)
+            self.table_model.set_field(entry_data, field, original_value)
+            
+            # Shrink the row once no suggestions are left
+            self.update_suggestion_row(entry_data)
             
         except Exception as e:
             print(f"Error rejecting Shazam value: {str(e)}")
@@ -2516,48 +3136,38 @@ class MetadataEditor(QMainWindow):
                     writer.writerow(headers)
                     
                     # Write visible rows
-                    for row in range(self.table.rowCount()):
-                        if not self.table.isRowHidden(row):
-                            # Get the ID from the current row
-                            id_item = self.table.item(row, self.COL_ID)
-                            if not id_item:
-                                continue
-                            
-                            # Find the entry using ID
-                            entry_id = id_item.text()
-                            entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-                            
-                            if entry:
-                                # Get file type from table
-                                type_item = self.table.item(row, 2)
-                                file_type = type_item.text() if type_item else ''
-                                
-                                # Read metadata from primary file
-                                metadata = MetadataUtil.read_metadata(entry['filepaths'][0])
-                                
-                                # Format credits properly - remove empty credits and handle single credit case
-                                credits = {credit for credit in metadata.get('CREDITS', set()) 
-                                         if credit and not credit.isspace()}
-                                credits_str = '; '.join(sorted(credits)) if len(credits) > 1 else next(iter(credits), '')
-                                
-                                row_data = [
-                                    file_type,
-                                    os.path.basename(os.path.dirname(os.path.dirname(entry['filepaths'][0]))),
-                                    metadata.get('TITLE', '').strip(),
-                                    metadata.get('SUBTITLE', '').strip(),
-                                    metadata.get('ARTIST', '').strip(),
-                                    metadata.get('GENRE', '').strip(),
-                                    credits_str,
-                                    metadata.get('MUSIC', '').strip(),
-                                    metadata.get('BANNER', '').strip(),
-                                    metadata.get('BACKGROUND', '').strip(),
-                                    metadata.get('CDTITLE', '').strip(),
-                                    metadata.get('SAMPLESTART', '').strip(),
-                                    metadata.get('SAMPLELENGTH', '').strip(),
-                                    metadata.get('DISPLAYBPM', '').strip(),
-                                    metadata.get('SELECTABLE', '').strip()
-                                ]
-                                writer.writerow(row_data)
+                    for row in range(self.table_proxy.rowCount()):
+                        entry = self.entry_at(row)
+                    
+                        if entry:
+                            file_type = entry.file_type
+                        
+                            # Read metadata from primary file
+                            metadata = MetadataUtil.read_header_cached(entry.filepaths[0])
+                        
+                            # Format credits properly - remove empty credits and handle single credit case
+                            credits = {credit for credit in MetadataUtil.read_credits_cached(entry.filepaths[0], metadata)
+                                     if credit and not credit.isspace()}
+                            credits_str = '; '.join(sorted(credits)) if len(credits) > 1 else next(iter(credits), '')
+                        
+                            row_data = [
+                                file_type,
+                                os.path.basename(os.path.dirname(os.path.dirname(entry.filepaths[0]))),
+                                metadata.get('TITLE', '').strip(),
+                                metadata.get('SUBTITLE', '').strip(),
+                                metadata.get('ARTIST', '').strip(),
+                                metadata.get('GENRE', '').strip(),
+                                credits_str,
+                                metadata.get('MUSIC', '').strip(),
+                                metadata.get('BANNER', '').strip(),
+                                metadata.get('BACKGROUND', '').strip(),
+                                metadata.get('CDTITLE', '').strip(),
+                                metadata.get('SAMPLESTART', '').strip(),
+                                metadata.get('SAMPLELENGTH', '').strip(),
+                                metadata.get('DISPLAYBPM', '').strip(),
+                                metadata.get('SELECTABLE', '').strip()
+                            ]
+                            writer.writerow(row_data)
                 
                 QMessageBox.information(self, "Success", "Data exported successfully!")
                 
@@ -2566,21 +3176,18 @@ class MetadataEditor(QMainWindow):
             traceback.print_exc()
 
     def find_row_by_id(self, entry_id):
-        """Find the current row number for a given entry ID"""
-        for row in range(self.table.rowCount()):
-            id_item = self.table.item(row, self.COL_ID)
-            if id_item and id_item.text() == entry_id:
-                return row
-        print(f"Debug: Could not find row for ID {entry_id}")
-        return -1
+        """Find the current row number for a given entry ID, or -1 if the filter hides it"""
+        source_row = self.table_model.rows_by_id.get(entry_id)
+        if source_row is None:
+            return -1
+        # The proxy keeps its own source-to-view mapping, so this holds under any filter
+        return self.table_proxy.mapFromSource(self.table_model.index(source_row, 0)).row()
 
     def verify_row_id_mapping(self):
         """Debug helper to print current row-ID mappings"""
         print("\nCurrent Row-ID Mappings:")
-        for row in range(self.table.rowCount()):
-            id_item = self.table.item(row, self.COL_ID)
-            if id_item:
-                print(f"Row {row}: ID {id_item.text()}")
+        for row in range(self.table_proxy.rowCount()):
+            print(f"Row {row}: ID {self.entry_at(row).id}")
 
     def shazam_all(self):
         """Process all visible songs with Shazam"""
@@ -2589,8 +3196,7 @@ class MetadataEditor(QMainWindow):
             return
             
         # Count visible songs
-        total = sum(1 for row in range(self.table.rowCount()) 
-                   if not self.table.isRowHidden(row))
+        total = self.table_proxy.rowCount()
         
         reply = QMessageBox.question(
             self,
@@ -2651,17 +3257,16 @@ class MetadataEditor(QMainWindow):
         processed = 0
         batch_size = 10  # Process 10 songs at a time
         
-        # Get list of visible rows
-        visible_rows = [row for row in range(self.table.rowCount()) 
-                       if not self.table.isRowHidden(row)]
+        # Get list of visible songs
+        visible_entries = [self.entry_at(row) for row in range(self.table_proxy.rowCount())]
         
         # Process in batches
-        for i in range(0, len(visible_rows), batch_size):
+        for i in range(0, len(visible_entries), batch_size):
             if self.cancelled:
                 break
                 
-            batch = visible_rows[i:i + batch_size]
-            for row in batch:
+            batch = visible_entries[i:i + batch_size]
+            for entry in batch:
                 processed += 1
                 remaining = total - processed
                 est_seconds = remaining * 1.75
@@ -2682,22 +3287,13 @@ class MetadataEditor(QMainWindow):
                 
                 try:
                     # Get the music file path
-                    id_item = self.table.item(row, self.COL_ID)
-                    if id_item:
-                        entry_id = id_item.text()
-                        entry = next((e for e in self.file_entries if e['id'] == entry_id), None)
-                        
-                        if entry:
-                            directory = os.path.dirname(entry['filepaths'][0])
-                            for file in os.listdir(directory):
-                                if file.lower().endswith(tuple(SUPPORTED_AUDIO)):
-                                    music_path = os.path.join(directory, file)
-                                    await self.run_shazam_analysis(music_path, row)
-                                    await asyncio.sleep(1.25)  # Delay between requests
-                                    break
+                    music_path = self.get_song_assets(entry).music_path
+                    if music_path:
+                        await self.run_shazam_analysis(music_path, entry.id)
+                        await asyncio.sleep(1.25)  # Delay between requests
                                     
                 except Exception as e:
-                    print(f"Error processing row {row}: {str(e)}")
+                    print(f"Error processing song {entry.id}: {str(e)}")
                     continue  # Continue to next song if one fails
             
             # Add a longer pause between batches
@@ -2706,80 +3302,53 @@ class MetadataEditor(QMainWindow):
         return processed
 
     def collect_credits(self):
-        """Collect all unique credits from loaded files"""
+        """Collect all unique credits from loaded songs, and the IDs of songs without any"""
         all_credits = set()
-        files_without_credits = set()  # Track files with no credits
+        files_without_credits = set()  # Track songs with no credits
         
         for entry in self.file_entries:
-            entry_has_credits = False
-            for filepath in entry['filepaths']:
-                metadata = MetadataUtil.read_metadata(filepath)
-                if 'CREDITS' in metadata and metadata['CREDITS']:
-                    valid_credits = {credit.lower() for credit in metadata['CREDITS'] 
-                                   if credit and not credit.isspace()}
-                    if valid_credits:
-                        entry_has_credits = True
-                        all_credits.update(valid_credits)
-        
-            if not entry_has_credits:
-                files_without_credits.add(entry['id'])
-        
-        # Add special "no credits" entry if any files lack credits
+            valid_credits = {credit.lower() for credit in entry.credits if credit and not credit.isspace()}
+            if valid_credits:
+                all_credits.update(valid_credits)
+            else:
+                files_without_credits.add(entry.id)
+        
+        # Add special "no credits" entry if any songs lack credits
         if files_without_credits:
             all_credits.add('no credits! :(')
             
         return sorted(all_credits), files_without_credits  # Return both sets of data
 
     def show_credit_search(self):
-        """Show the credit selector dialog"""
+        """Show the credit selector dialog once the .ssc chart credits have been read"""
+        if self.open_credit_selector not in self.chart_callbacks:
+            self.with_chart_credits(self.open_credit_selector)
+            
+    def open_credit_selector(self):
         credits, files_without_credits = self.collect_credits()
         dialog = CreditSelectorDialog(self, credits)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.apply_credit_filter(dialog.selected_credits)
+            self.apply_credit_filter(dialog.selected_credits, files_without_credits)
 
-    def apply_credit_filter(self, selected_credits):
+    def apply_credit_filter(self, selected_credits, files_without_credits):
         """Apply credit filter with special handling for 'no credits'"""
-        print(f"Selected credits: {selected_credits}")  # Debug print
-        shown_count = 0
-        total_count = len(self.file_entries)
-        
-        # Get files without credits when collecting credits
-        all_credits, files_without_credits = self.collect_credits()
-        
-        for entry in self.file_entries:
-            show_entry = False
-            
-            # Special handling for "no credits! :(" selection
-            if 'no credits! :(' in selected_credits:
-                if entry['id'] in files_without_credits:
-                    show_entry = True
-            
-            # Normal credit matching
-            if not show_entry:  # Only check if not already shown
-                metadata = MetadataUtil.read_metadata(entry['filepaths'][0])
-                song_credits = metadata.get('CREDITS', set())
-                for credit in selected_credits:
-                    if credit != 'no credits! :(' and any(credit.lower() in song_credit.lower() for song_credit in song_credits):
-                        show_entry = True
-                        break
-            
-            row = self.find_row_by_id(entry['id'])
-            print(f"Found row {row} for ID {entry['id']}")  # Debug print
-            
-            if row != -1:
-                self.table.setRowHidden(row, not show_entry)
-                if show_entry:
-                    shown_count += 1
-                    print(f"Showing entry with credits: {song_credits}")  # Debug print
+        show_uncredited = 'no credits! :(' in selected_credits
+        selected = [credit.lower() for credit in selected_credits if credit != 'no credits! :(']
+        shown_ids = {
+            entry.id for entry in self.file_entries
+            if (show_uncredited and entry.id in files_without_credits)
+            or any(credit in song_credit.lower() for song_credit in entry.credits for credit in selected)
+        }
         
-        print(f"Total shown: {shown_count} out of {total_count}")  # Debug print
-        self.update_display_count(shown_count, total_count)
+        # Hide every other row in one pass
+        self.table_proxy.set_filter(lambda entry: entry.id in shown_ids)
+        self.update_display_count(self.table_proxy.rowCount(), len(self.file_entries))
         
         # Update status bar
         self.statusBar().showMessage("Credit filter applied")
 
 class PackSelectorDialog(QDialog):
-    def __init__(self, parent, directories):
+    def __init__(self, parent, directories, pack_info=None):
         super().__init__(parent)
         self.setWindowTitle("Select Packs")
         self.setMinimumSize(800, 600)
@@ -2787,9 +3356,13 @@ class PackSelectorDialog(QDialog):
         
         # Convert directories to list and store as instance variable
         self.directories = sorted(list(directories), key=str.lower)
+        # Pack name -> (song count, total bytes), shown in the button tooltips
+        self.pack_info = dict(pack_info or {})
         self.selected_packs = set()
         self.buttons = {}
         self.is_accepting = False
+        self.closed = False  # Set once exec() returns, so late background updates are ignored
+        self.button_width = 240
         
         # Create the UI after initializing variables
         self.setup_ui()
@@ -2806,46 +3379,23 @@ class PackSelectorDialog(QDialog):
             warning_label.setWordWrap(True)
             layout.addWidget(warning_label)
             
+            # Background revalidation status, only shown when packs come from a stored manifest
+            self.status_label = QLabel()
+            self.status_label.setStyleSheet("color: #666;")
+            self.status_label.hide()
+            layout.addWidget(self.status_label)
+            
             # Create scroll area
             scroll_area = QScrollArea()
             scroll_area.setWidgetResizable(True)
             scroll_widget = QWidget()
-            scroll_layout = QGridLayout(scroll_widget)
-            scroll_layout.setSpacing(4)
-            
-
-            button_width = 240 
+            self.scroll_layout = QGridLayout(scroll_widget)
+            self.scroll_layout.setSpacing(4)
             
             # Create pack buttons with proper reference handling
-            row = col = 0
             for pack in self.directories:
-                btn = QPushButton(str(pack))  # Ensure string conversion
-                btn.setCheckable(True)
-                btn.setFixedWidth(button_width)
-                btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-                
-                # Set the stylesheet for the button
-                btn.setStyleSheet("""
-                    QPushButton:checked {
-                        background-color: lightgreen;
-                    }
-                """)
-                
-                # Store button reference and connect with lambda
-                self.buttons[pack] = btn
-                btn.clicked.connect(lambda checked, p=pack: self.toggle_pack(p))
-                
-                btn.setToolTip(str(pack))
-                scroll_layout.addWidget(btn, row, col)
-                
-                col += 1
-                if col >= 3:
-                    col = 0
-                    row += 1
-            
-            # Add stretch to push buttons to top
-            scroll_layout.setRowStretch(row + 1, 1)
-            scroll_layout.setColumnStretch(3, 1)
+                self.create_pack_button(pack)
+            self.layout_pack_buttons()
             
             scroll_area.setWidget(scroll_widget)
             layout.addWidget(scroll_area)
@@ -2879,6 +3429,77 @@ class PackSelectorDialog(QDialog):
             import traceback
             traceback.print_exc()
     
+    def create_pack_button(self, pack):
+        btn = QPushButton(str(pack))  # Ensure string conversion
+        btn.setCheckable(True)
+        btn.setFixedWidth(self.button_width)
+        btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        
+        # Set the stylesheet for the button
+        btn.setStyleSheet("""
+            QPushButton:checked {
+                background-color: lightgreen;
+            }
+        """)
+        
+        # Store button reference and connect with lambda
+        self.buttons[pack] = btn
+        btn.clicked.connect(lambda checked, p=pack: self.toggle_pack(p))
+        self.update_pack_tooltip(pack)
+        return btn
+        
+    def update_pack_tooltip(self, pack):
+        tooltip = str(pack)
+        if pack in self.pack_info:
+            song_count, total_bytes = self.pack_info[pack]
+            tooltip += f"\n{song_count} song{'s' if song_count != 1 else ''}, {total_bytes / (1024 * 1024):.1f} MB"
+        self.buttons[pack].setToolTip(tooltip)
+        
+    def layout_pack_buttons(self):
+        """Place the pack buttons in a three column grid in name order"""
+        for btn in self.buttons.values():
+            self.scroll_layout.removeWidget(btn)
+            
+        row = col = 0
+        for pack in self.directories:
+            self.scroll_layout.addWidget(self.buttons[pack], row, col)
+            col += 1
+            if col >= 3:
+                col = 0
+                row += 1
+        
+        # Add stretch to push buttons to top
+        for stretch_row in range(self.scroll_layout.rowCount()):
+            self.scroll_layout.setRowStretch(stretch_row, 0)
+        self.scroll_layout.setRowStretch(row + 1, 1)
+        self.scroll_layout.setColumnStretch(3, 1)
+        
+    def update_pack(self, pack, song_count, total_bytes):
+        """Add a pack found while revalidating, or refresh the details of one already listed"""
+        self.pack_info[pack] = (song_count, total_bytes)
+        if pack in self.buttons:
+            self.update_pack_tooltip(pack)
+            return
+        self.directories = sorted(self.directories + [pack], key=str.lower)
+        self.create_pack_button(pack)
+        self.layout_pack_buttons()
+        
+    def remove_pack(self, pack):
+        """Drop a pack that no longer exists on disk"""
+        if pack not in self.buttons:
+            return
+        self.directories.remove(pack)
+        self.selected_packs.discard(pack)
+        self.pack_info.pop(pack, None)
+        btn = self.buttons.pop(pack)
+        self.scroll_layout.removeWidget(btn)
+        btn.deleteLater()
+        self.layout_pack_buttons()
+        
+    def set_status(self, text):
+        self.status_label.setText(text)
+        self.status_label.setVisible(bool(text))
+        
     def toggle_pack(self, pack):
         """Toggle pack selection state with error handling"""
         try:
@@ -3156,29 +3777,14 @@ class ArtworkPreviewDialog(QDialog):
             self.new_image.save(self.current_img_path)
             
             # Update metadata in files
+            jacket_name = os.path.basename(self.current_img_path)
             for filepath in self.filepaths:
-                content, encoding = MetadataUtil.read_file_with_encoding(filepath)
-                if not content:
+                document = SimfileDocument.load(filepath)
+                if not document:
                     continue
                 
-                jacket_name = os.path.basename(self.current_img_path)
-                jacket_line_exists = False
-                
-                for i, line in enumerate(content):
-                    if line.startswith('#JACKET:'):
-                        content[i] = f'#JACKET:{jacket_name};\n'
-                        jacket_line_exists = True
-                        break
-                
-                if not jacket_line_exists:
-                    # Find #TITLE: line and add JACKET after it
-                    for i, line in enumerate(content):
-                        if line.startswith('#TITLE:'):
-                            content.insert(i + 1, f'#JACKET:{jacket_name};\n')
-                            break
-                
-                with open(filepath, 'w', encoding=encoding) as file:
-                    file.writelines(content)
+                document.set('JACKET', jacket_name)
+                document.save()
             
             QMessageBox.information(self, "Success", "Artwork updated successfully!")
             self.accept()
@@ -3432,6 +4038,35 @@ class SettingsDialog(QDialog):
         export_group.setLayout(export_layout)
         layout.addWidget(export_group)
 
+        # Cache Settings
+        cache_group = QGroupBox("Cache Settings")
+        cache_layout = QVBoxLayout()
+        
+        clear_cache_btn = QPushButton("Clear Metadata Cache")
+        clear_cache_btn.setToolTip("Forget cached song metadata so every file is parsed again on the next load")
+        clear_cache_btn.clicked.connect(self.clear_metadata_cache)
+        cache_layout.addWidget(clear_cache_btn)
+        
+        cache_group.setLayout(cache_layout)
+        layout.addWidget(cache_group)
+
+        # Performance Settings
+        performance_group = QGroupBox("Performance Settings")
+        performance_layout = QHBoxLayout()
+        
+        performance_layout.addWidget(QLabel("Parser threads:"))
+        self.parse_workers_spin = QSpinBox()
+        self.parse_workers_spin.setRange(1, 64)
+        self.parse_workers_spin.setValue(self.parent.parse_workers)
+        self.parse_workers_spin.setToolTip("Threads used to read simfiles while loading packs (1 = serial)")
+        self.parse_workers_spin.valueChanged.connect(
+            lambda value: setattr(self.parent, 'parse_workers', value)
+        )
+        performance_layout.addWidget(self.parse_workers_spin)
+        
+        performance_group.setLayout(performance_layout)
+        layout.addWidget(performance_group)
+
        
 
         # Close button at bottom
@@ -3490,6 +4125,17 @@ class SettingsDialog(QDialog):
                 f"Failed to toggle audio: {str(e)}"
             )
 
+    def clear_metadata_cache(self):
+        try:
+            self.parent.metadata_cache.clear()
+            QMessageBox.information(self, "Cache Cleared", "The metadata cache has been cleared.")
+        except Exception as e:
+            QMessageBox.warning(
+                self,
+                "Error",
+                f"Failed to clear metadata cache: {str(e)}"
+            )
+
 def main():
     try:
         # Enable high DPI scaling
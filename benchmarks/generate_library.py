@@ -0,0 +1,203 @@
+"""Generate a synthetic StepMania library for benchmarking the parser and loader.
+
+Example:
+    python benchmarks/generate_library.py /tmp/sm_bench_library --packs 20 --songs 50
+"""
+import argparse
+import os
+import random
+import shutil
+
+STEPS_TYPES = ['dance-single', 'dance-double']
+DIFFICULTIES = [('Beginner', 1, 3), ('Easy', 2, 5), ('Medium', 4, 8), ('Hard', 7, 11), ('Challenge', 10, 15)]
+TITLES = ['Starlight', 'Overdrive', 'Midnight Run', 'Paradox', 'Neon Rain', 'Afterglow', 'Velocity']
+JAPANESE_TITLES = ['星の歌', '夜明けのメロディ', 'ハレ晴レユカイ', '幻想郷', '千本桜']
+ARTISTS = ['DJ Example', 'Synth Collective', 'Camellia-ish', 'The Steppers', 'Nameless']
+GENRES = ['Trance', 'Hardcore', 'J-Pop', 'Drum & Bass', 'Eurobeat', '']
+# Written into every generated library, so only those are ever replaced without --force
+MARKER_FILE = '.synthetic_library'
+
+
+def make_notes(rng, measures):
+    """Build a note section with the given number of 4-row measures"""
+    rows = []
+    for measure in range(measures):
+        for _ in range(4):
+            rows.append(''.join(rng.choice('0001') for _ in range(4)))
+        rows.append(',' if measure < measures - 1 else ';')
+    return '\n'.join(rows) + '\n'
+
+
+def make_header(rng, title, artist, genre, credit, music, ssc):
+    lines = []
+    if ssc:
+        lines.append('#VERSION:0.83;')
+    lines += [
+        f'#TITLE:{title};',
+        '#SUBTITLE:;',
+        f'#ARTIST:{artist};',
+        '#TITLETRANSLIT:;',
+        '#SUBTITLETRANSLIT:;',
+        '#ARTISTTRANSLIT:;',
+        f'#GENRE:{genre};',
+        f'#CREDIT:{credit};',
+        '#BANNER:bn.png;',
+        '#BACKGROUND:bg.png;',
+        '#JACKET:jacket.png;',
+        '#CDTITLE:;',
+        f'#MUSIC:{music};',
+        '#OFFSET:-0.012;',
+        f'#SAMPLESTART:{rng.randint(20, 60)}.000;',
+        '#SAMPLELENGTH:12.000;',
+        '#SELECTABLE:YES;',
+        f'#BPMS:0.000={rng.randint(120, 200)}.000;',
+        '#STOPS:;',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def make_sm(rng, header, charts, measures):
+    parts = [header]
+    for steps_type, difficulty, meter, author in charts:
+        parts.append(
+            f'//---------------{steps_type} - {author}----------------\n'
+            f'#NOTES:\n     {steps_type}:\n     {author}:\n     {difficulty}:\n     {meter}:\n'
+            f'     0.500,0.500,0.500,0.000,0.000:\n'
+        )
+        parts.append(make_notes(rng, measures))
+    return ''.join(parts)
+
+
+def make_ssc(rng, header, charts, measures):
+    parts = [header]
+    for steps_type, difficulty, meter, author in charts:
+        parts.append(
+            f'//---------------{steps_type} - {author}----------------\n'
+            f'#NOTEDATA:;\n#CHARTNAME:;\n#STEPSTYPE:{steps_type};\n#DESCRIPTION:{author};\n'
+            f'#CHARTSTYLE:;\n#DIFFICULTY:{difficulty};\n#METER:{meter};\n#RADARVALUES:0,0,0,0,0;\n'
+            f'#CREDIT:{author};\n#NOTES:\n'
+        )
+        parts.append(make_notes(rng, measures))
+    return ''.join(parts)
+
+
+def write_simfile(path, text, encoding, bom, crlf):
+    if crlf:
+        text = text.replace('\n', '\r\n')
+    data = text.encode(encoding)
+    if bom:
+        data = b'\xef\xbb\xbf' + data
+    with open(path, 'wb') as file:
+        file.write(data)
+    return len(data)
+
+
+def prepare_root(root, force=False):
+    """Clear out a previously generated library at root
+    
+    An existing non-empty directory is only replaced if it carries the generator's marker file
+    or force is given, so a mistyped path can't wipe a real song library.
+    """
+    if os.path.lexists(root):
+        if not os.path.isdir(root) or os.path.islink(root):
+            raise FileExistsError(f"{root} exists and is not a directory")
+        if os.listdir(root) and not force and not os.path.exists(os.path.join(root, MARKER_FILE)):
+            raise FileExistsError(
+                f"{root} is not empty and wasn't written by this generator; use --force to replace it"
+            )
+        shutil.rmtree(root)
+    os.makedirs(root)
+    with open(os.path.join(root, MARKER_FILE), 'w') as file:
+        file.write('Synthetic StepMania library written by benchmarks/generate_library.py\n')
+
+
+def generate_library(root, packs=10, songs=50, charts=5, pair_ratio=0.3, ssc_ratio=0.4,
+                     sjis_ratio=0.1, bom_ratio=0.1, crlf_ratio=0.2, measures=64,
+                     large_ratio=0.05, large_measures=2000, seed=1, force=False):
+    """Write a synthetic library and return (simfile count, total simfile bytes)"""
+    rng = random.Random(seed)
+    prepare_root(root, force)
+
+    file_count = 0
+    total_bytes = 0
+    for pack_index in range(packs):
+        pack_dir = os.path.join(root, f'Synthetic Pack {pack_index + 1:03d}')
+        for song_index in range(songs):
+            song_dir = os.path.join(pack_dir, f'Song {song_index + 1:04d}')
+            os.makedirs(song_dir)
+
+            sjis = rng.random() < sjis_ratio
+            title = rng.choice(JAPANESE_TITLES if sjis else TITLES) + f' {song_index + 1}'
+            artist = rng.choice(ARTISTS)
+            genre = rng.choice(GENRES)
+            credit = f'stepper{rng.randint(1, 40)}'
+            music = 'song.ogg'
+
+            song_charts = []
+            for chart_index in range(charts):
+                difficulty, low, high = DIFFICULTIES[chart_index % len(DIFFICULTIES)]
+                steps_type = STEPS_TYPES[(chart_index // len(DIFFICULTIES)) % len(STEPS_TYPES)]
+                song_charts.append((steps_type, difficulty, rng.randint(low, high), credit))
+
+            song_measures = large_measures if rng.random() < large_ratio else measures
+            encoding = 'shift-jis' if sjis else 'utf-8'
+            bom = not sjis and rng.random() < bom_ratio
+            crlf = rng.random() < crlf_ratio
+
+            roll = rng.random()
+            write_sm_file = roll >= ssc_ratio or roll < pair_ratio * ssc_ratio
+            write_ssc_file = roll < ssc_ratio
+            if write_sm_file:
+                header = make_header(rng, title, artist, genre, credit, music, ssc=False)
+                total_bytes += write_simfile(os.path.join(song_dir, 'song.sm'),
+                                             make_sm(rng, header, song_charts, song_measures), encoding, bom, crlf)
+                file_count += 1
+            if write_ssc_file:
+                header = make_header(rng, title, artist, genre, credit, music, ssc=True)
+                total_bytes += write_simfile(os.path.join(song_dir, 'song.ssc'),
+                                             make_ssc(rng, header, song_charts, song_measures), encoding, bom, crlf)
+                file_count += 1
+
+            # Small placeholder assets so audio and jacket lookups have something to find
+            with open(os.path.join(song_dir, music), 'wb') as file:
+                file.write(b'OggS' + bytes(rng.randint(64, 256)))
+            with open(os.path.join(song_dir, 'jacket.png'), 'wb') as file:
+                file.write(b'\x89PNG' + bytes(32))
+
+    return file_count, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('root', help='Directory to create; an earlier generated library there is replaced, '
+                        'any other non-empty directory only with --force')
+    parser.add_argument('--packs', type=int, default=10)
+    parser.add_argument('--songs', type=int, default=50, help='Songs per pack')
+    parser.add_argument('--charts', type=int, default=5, help='Charts per song')
+    parser.add_argument('--ssc-ratio', type=float, default=0.4, help='Share of songs with an .ssc file')
+    parser.add_argument('--pair-ratio', type=float, default=0.3, help='Share of .ssc songs that also have an .sm')
+    parser.add_argument('--sjis-ratio', type=float, default=0.1, help='Share of songs encoded as Shift-JIS')
+    parser.add_argument('--bom-ratio', type=float, default=0.1, help='Share of UTF-8 songs written with a BOM')
+    parser.add_argument('--crlf-ratio', type=float, default=0.2, help='Share of songs with CRLF line endings')
+    parser.add_argument('--measures', type=int, default=64, help='Measures per chart')
+    parser.add_argument('--large-ratio', type=float, default=0.05, help='Share of songs with large note sections')
+    parser.add_argument('--large-measures', type=int, default=2000, help='Measures per chart for large songs')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--force', action='store_true', help='Replace root even if it holds other files')
+    args = parser.parse_args()
+
+    try:
+        file_count, total_bytes = generate_library(
+            args.root, packs=args.packs, songs=args.songs, charts=args.charts,
+            pair_ratio=args.pair_ratio, ssc_ratio=args.ssc_ratio, sjis_ratio=args.sjis_ratio,
+            bom_ratio=args.bom_ratio, crlf_ratio=args.crlf_ratio, measures=args.measures,
+            large_ratio=args.large_ratio, large_measures=args.large_measures, seed=args.seed,
+            force=args.force
+        )
+    except FileExistsError as e:
+        parser.error(str(e))
+    print(f"Wrote {file_count} simfiles ({total_bytes / 1e6:.1f} MB) to {args.root}")
+
+
+if __name__ == '__main__':
+    main()
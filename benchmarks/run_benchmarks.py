@@ -0,0 +1,211 @@
+"""Time simfile reading, writing, encoding detection and full library scans.
+
+Results are reported as files/s and MB/s. Use --save-baseline to record the current numbers,
+later runs compare against them and exit with status 1 if any benchmark regressed.
+
+Example:
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --library /tmp/sm_bench_library
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from generate_library import generate_library
+from sm_metadata_core import (
+    MetadataCache, MetadataUtil, PARSE_WORKERS, SimfileDocument, SongScanner, SUPPORTED_EXTENSIONS
+)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+def find_simfiles(root):
+    simfiles = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in SUPPORTED_EXTENSIONS:
+                simfiles.append(os.path.join(dirpath, filename))
+    return simfiles
+
+
+def reset_state():
+    """Forget encoding counters and the cache so every repeat starts cold"""
+    MetadataUtil.encoding_hits.clear()
+    MetadataUtil.encoding_misses.clear()
+    MetadataUtil.cache = None
+
+
+def best_time(func, repeat, setup=None):
+    """Run func repeat times and return the fastest wall-clock time"""
+    times = []
+    for _ in range(repeat):
+        reset_state()
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    reset_state()
+    return min(times)
+
+
+def run_benchmarks(library, repeat):
+    simfiles = find_simfiles(library)
+    total_bytes = sum(os.path.getsize(path) for path in simfiles)
+    pack_dirs = sorted(
+        os.path.join(library, name) for name in os.listdir(library)
+        if os.path.isdir(os.path.join(library, name))
+    )
+    buffers = []
+    for path in simfiles:
+        with open(path, 'rb') as file:
+            buffers.append(file.read())
+
+    def decode_all():
+        for data in buffers:
+            MetadataUtil.decode_bytes(data)
+
+    def read_all():
+        for path in simfiles:
+            MetadataUtil.read_metadata(path)
+
+    def read_headers():
+        for path in simfiles:
+            MetadataUtil.read_header(path)
+
+    work_dir = tempfile.mkdtemp(prefix='sm_bench_')
+    write_targets = [os.path.join(work_dir, os.path.relpath(path, library)) for path in simfiles]
+
+    def copy_library():
+        for source, target in zip(simfiles, write_targets):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+
+    def write_all():
+        for path in write_targets:
+            document = SimfileDocument.load(path)
+            document.set('TITLE', 'Benchmark Title')
+            document.set('ARTIST', 'Benchmark Artist')
+            document.save()
+
+    def scan(workers):
+        return lambda: sum(1 for _ in SongScanner.scan(pack_dirs, workers))
+
+    cache_path = os.path.join(work_dir, 'cache.sqlite3')
+
+    def scan_cached():
+        cache = MetadataCache(cache_path)
+        MetadataUtil.cache = cache
+        try:
+            sum(1 for _ in SongScanner.scan(pack_dirs, PARSE_WORKERS))
+            cache.flush()
+        finally:
+            cache.close()
+
+    def warm_cache():
+        scan_cached()
+        MetadataUtil.cache = None
+
+    benchmarks = [
+        ('encoding_detection', decode_all, None),
+        ('read_full', read_all, None),
+        ('read_header', read_headers, None),
+        ('write_metadata', write_all, copy_library),
+        ('scan_serial', scan(1), None),
+        ('scan_parallel', scan(PARSE_WORKERS), None),
+        ('scan_cached', scan_cached, warm_cache),
+    ]
+
+    results = {}
+    try:
+        for name, func, setup in benchmarks:
+            seconds = best_time(func, repeat, setup)
+            results[name] = {
+                'seconds': seconds,
+                'files_per_s': len(simfiles) / seconds,
+                'mb_per_s': total_bytes / 1e6 / seconds,
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    library_info = {'files': len(simfiles), 'bytes': total_bytes, 'workers': PARSE_WORKERS}
+    return library_info, results
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def report(library_info, results, baseline, tolerance):
+    """Print the results table and return the names of regressed benchmarks"""
+    print(f"Library: {library_info['files']} simfiles, {library_info['bytes'] / 1e6:.1f} MB, "
+          f"{library_info['workers']} parser threads")
+    if baseline and baseline['library'] != library_info:
+        print("Warning: baseline was recorded on a different library; comparisons are not meaningful")
+
+    regressions = []
+    print(f"{'benchmark':<20}{'seconds':>10}{'files/s':>12}{'MB/s':>10}{'vs baseline':>14}")
+    for name, result in results.items():
+        change = ''
+        previous = baseline and baseline['results'].get(name)
+        if previous:
+            ratio = result['files_per_s'] / previous['files_per_s']
+            change = f"{(ratio - 1) * 100:+.1f}%"
+            if ratio < 1 - tolerance:
+                change += ' REGRESSION'
+                regressions.append(name)
+        print(f"{name:<20}{result['seconds']:>10.3f}{result['files_per_s']:>12.0f}"
+              f"{result['mb_per_s']:>10.1f}{change:>14}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--library', help='Existing library to benchmark (default: generate one in a temp dir)')
+    parser.add_argument('--packs', type=int, default=10, help='Packs to generate when --library is not given')
+    parser.add_argument('--songs', type=int, default=50, help='Songs per generated pack')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the fastest is reported')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed throughput drop before a benchmark is flagged (default 0.15 = 15%%)')
+    args = parser.parse_args()
+
+    generated = None
+    library = args.library
+    if not library:
+        generated = tempfile.mkdtemp(prefix='sm_bench_library_')
+        library = os.path.join(generated, 'Songs')
+        generate_library(library, packs=args.packs, songs=args.songs)
+
+    try:
+        library_info, results = run_benchmarks(library, args.repeat)
+    finally:
+        if generated:
+            shutil.rmtree(generated, ignore_errors=True)
+
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    regressions = report(library_info, results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump({'library': library_info, 'results': results}, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,366 @@
+"""Headless command line tool for batch simfile metadata maintenance (no Qt, pygame or shazamio needed)
+
+Every command prints one JSON object per line on stdout; progress and errors go to stderr.
+
+Examples:
+    python sm_metadata_cli.py scan /path/to/Songs > songs.jsonl
+    python sm_metadata_cli.py export /path/to/Songs -o songs.csv
+    python sm_metadata_cli.py get /path/to/Songs/Pack/Song/song.ssc --field TITLE --field CREDIT
+    python sm_metadata_cli.py find /path/to/Songs --field artist --contains camellia --paths
+    python sm_metadata_cli.py find /path/to/Songs --field genre --empty --paths | \\
+        python sm_metadata_cli.py set-field GENRE "Unknown" -
+    python sm_metadata_cli.py set-credit "New Stepper" "/path/to/Songs/My Pack"
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+from sm_metadata_core import (
+    SUPPORTED_EXTENSIONS, METADATA_FIELDS, PARSE_WORKERS, MetadataUtil, SimfileDocument, MetadataCache,
+    LibrarySnapshot, SongScanner
+)
+
+SEARCH_FIELDS = ['title', 'subtitle', 'artist', 'genre', 'credit']
+EXPORT_HEADERS = [
+    'Type', 'Pack', 'Title', 'Subtitle', 'Artist', 'Genre', 'Credits', 'Music File', 'Banner',
+    'Background', 'CDTitle', 'Sample Start', 'Sample Length', 'Display BPM', 'Selectable'
+]
+EXPORT_TAGS = ['MUSIC', 'BANNER', 'BACKGROUND', 'CDTITLE', 'SAMPLESTART', 'SAMPLELENGTH', 'DISPLAYBPM', 'SELECTABLE']
+# Tags set-field writes without --allow-unknown; a typo would otherwise add a bogus header line
+SET_FIELD_TAGS = sorted(set(METADATA_FIELDS + EXPORT_TAGS + ['JACKET', 'CREDIT']))
+
+
+def emit(out, record):
+    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def find_pack_dirs(roots, pack_names=None):
+    """Resolve library roots to pack directories, sharing one directory snapshot with the scanner"""
+    snapshot = LibrarySnapshot()
+    pack_dirs = set()
+    for root in roots:
+        root = os.path.abspath(root)
+        snapshot.scan(root)
+        packs = snapshot.find_packs(root)
+        if not packs and snapshot.has_simfiles(root):
+            # Same as the GUI: a folder of songs without pack folders is treated as one pack
+            packs = {(os.path.basename(root), root)}
+        pack_dirs.update(path for name, path in packs if not pack_names or name in pack_names)
+    return sorted(pack_dirs), snapshot
+
+
+def song_to_record(file_info, all_tags=False):
+    """Flatten a parsed song group into a JSON-friendly dict"""
+    metadata = file_info['metadata']
+    files = [file_info['primary_file']]
+    if 'secondary_file' in file_info:
+        files.append(file_info['secondary_file'])
+    record = {
+        'pack': os.path.basename(os.path.dirname(file_info['song_dir'])),
+        'type': file_info['type'],
+        'files': files,
+        'title': metadata.get('TITLE', '').strip(),
+        'subtitle': metadata.get('SUBTITLE', '').strip(),
+        'artist': metadata.get('ARTIST', '').strip(),
+        'genre': metadata.get('GENRE', '').strip(),
+        'music': metadata.get('MUSIC', '').strip(),
+        'credits': sorted(credit for credit in file_info['credits'] if credit.strip()),
+    }
+    if all_tags:
+        record['tags'] = {key: value for key, value in metadata.items() if key != 'CREDITS'}
+    return record
+
+
+def iter_songs(args):
+    pack_dirs, snapshot = find_pack_dirs(args.roots, set(args.pack) if args.pack else None)
+    print(f"Scanning {len(pack_dirs)} packs with {args.workers} threads", file=sys.stderr)
+    for file_info in SongScanner.scan(pack_dirs, args.workers, snapshot, chart_credits=args.chart_credits):
+        yield file_info
+
+
+def cmd_scan(args, out):
+    count = 0
+    for file_info in iter_songs(args):
+        emit(out, song_to_record(file_info, args.all_tags))
+        count += 1
+    return count, 0
+
+
+def cmd_export(args, out):
+    count = 0
+    with open(args.output, 'w', newline='', encoding='utf-8') if args.output != '-' else contextlib.nullcontext(out) as file:
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_HEADERS)
+        for file_info in iter_songs(args):
+            record = song_to_record(file_info)
+            metadata = file_info['metadata']
+            credits = record['credits']
+            writer.writerow(
+                [record['type'], record['pack'], record['title'], record['subtitle'], record['artist'],
+                 record['genre'], '; '.join(credits) if len(credits) > 1 else next(iter(credits), '')] +
+                [metadata.get(tag, '').strip() for tag in EXPORT_TAGS]
+            )
+            count += 1
+    return count, 0
+
+
+def cmd_get(args, out):
+    count = failed = 0
+    for filepath in expand_paths(args.paths):
+        try:
+            metadata = MetadataUtil.read_header(filepath)
+            credits = sorted(MetadataUtil.read_credits_cached(filepath, metadata))
+        except Exception as e:
+            emit(out, {'file': filepath, 'error': str(e)})
+            failed += 1
+            continue
+        metadata.pop('CREDITS', None)
+        if args.field:
+            tags = {}
+            for field in (field.upper() for field in args.field):
+                tags[field] = credits if field == 'CREDIT' else metadata.get(field)
+        else:
+            tags = dict(metadata, CREDIT=credits)
+        emit(out, {'file': filepath, 'tags': tags})
+        count += 1
+    return count, failed
+
+
+def build_matcher(args):
+    """Compile the find options into a predicate over song records"""
+    fields = [field.lower() for field in args.field] if args.field else SEARCH_FIELDS
+
+    def values(record):
+        for field in fields:
+            if field == 'credit':
+                yield from record['credits'] or ['']
+            else:
+                yield record.get(field, '')
+
+    if args.empty:
+        return lambda record: any(not value for value in values(record))
+    if args.regex:
+        pattern = re.compile(args.regex, 0 if args.case_sensitive else re.IGNORECASE)
+        return lambda record: any(pattern.search(value) for value in values(record))
+
+    needle = args.equals if args.equals is not None else args.contains
+    if needle is None:
+        return lambda record: True
+    if not args.case_sensitive:
+        needle = needle.casefold()
+    fold = (lambda value: value) if args.case_sensitive else str.casefold
+    if args.equals is not None:
+        return lambda record: any(fold(value) == needle for value in values(record))
+    return lambda record: any(needle in fold(value) for value in values(record))
+
+
+def cmd_find(args, out):
+    matches = build_matcher(args)
+    count = 0
+    for file_info in iter_songs(args):
+        record = song_to_record(file_info, args.all_tags)
+        if not matches(record):
+            continue
+        count += 1
+        if args.paths:
+            for filepath in record['files']:
+                out.write(filepath + '\n')
+        else:
+            emit(out, record)
+    return count, 0
+
+
+def expand_paths(paths):
+    """Expand simfile paths, folders (searched recursively) and '-' (paths read from stdin)"""
+    seen = set()
+    snapshot = LibrarySnapshot()
+    for path in paths:
+        candidates = [line.strip() for line in sys.stdin if line.strip()] if path == '-' else [path]
+        for candidate in candidates:
+            candidate = os.path.abspath(candidate)
+            if os.path.isdir(candidate):
+                snapshot.scan(candidate)
+                prefix = os.path.join(candidate, '')
+                found = sorted(
+                    os.path.join(directory, name)
+                    for directory, (_, files) in snapshot.dirs.items()
+                    if directory == candidate or directory.startswith(prefix)
+                    for name in files
+                    if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS
+                )
+            else:
+                found = [candidate]
+            for filepath in found:
+                if filepath not in seen:
+                    seen.add(filepath)
+                    yield filepath
+
+
+def apply_changes(args, out, changes):
+    """Write the same tag changes to every target simfile on a thread pool, invalidating the cache once at the end"""
+    for key, value in changes.items():
+        if '\n' in value or '\r' in value:
+            raise ValueError(f"Value for {key} must be a single line")
+
+    def write_one(filepath):
+        try:
+            document = SimfileDocument.load(filepath)
+            if not document:
+                return filepath, 'failed', 'could not read or decode file'
+            # Every occurrence must already match: set() also replaces chart-level tags like .ssc #CREDIT
+            if all(
+                document.values(key) and all(current == value for current in document.values(key))
+                for key, value in changes.items()
+            ):
+                return filepath, 'unchanged', None
+            if args.dry_run:
+                return filepath, 'would-update', None
+            for key, value in changes.items():
+                if not document.set(key, value):
+                    return filepath, 'failed', f'no #{key} tag and no #TITLE tag to insert it after'
+            document.save()
+            return filepath, 'updated', None
+        except Exception as e:
+            return filepath, 'failed', str(e)
+
+    count = failed = 0
+    written = []
+    # Writes skip the per-file cache invalidation; the whole batch is invalidated in one transaction
+    cache, MetadataUtil.cache = MetadataUtil.cache, None
+    try:
+        for filepath, status, error in SongScanner.ordered_map(write_one, expand_paths(args.paths), args.workers):
+            record = {'file': filepath, 'status': status}
+            if error:
+                record['error'] = error
+                failed += 1
+            else:
+                count += status in ('updated', 'would-update')
+            if status == 'updated':
+                written.append(filepath)
+            emit(out, record)
+    finally:
+        MetadataUtil.cache = cache
+        if cache and written:
+            cache.invalidate(written)
+    return count, failed
+
+
+def cmd_set_field(args, out):
+    field = args.field.upper()
+    if field not in SET_FIELD_TAGS and not args.allow_unknown:
+        emit(out, {
+            'field': field, 'status': 'failed',
+            'error': f"unknown tag #{field}; pass --allow-unknown to write it anyway"
+        })
+        return 0, 1
+    return apply_changes(args, out, {field: args.value})
+
+
+def cmd_set_credit(args, out):
+    # Like the GUI's bulk credit update, this replaces the song and every chart credit
+    return apply_changes(args, out, {'CREDIT': args.credit})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Batch StepMania simfile metadata tool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split('\n', 1)[1]
+    )
+    parser.add_argument('--workers', type=int, default=PARSE_WORKERS,
+                        help=f'Parser/writer threads (default {PARSE_WORKERS}; 1 runs serially)')
+    parser.add_argument('--no-cache', action='store_true', help="Don't read or update the persistent metadata cache")
+    parser.add_argument('--cache-path', help='Metadata cache file (default: the one shared with the GUI)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_library_args(subparser):
+        subparser.add_argument('roots', nargs='+', help='Library roots or pack folders')
+        subparser.add_argument('--pack', action='append', help='Only include packs with this name (repeatable)')
+        subparser.add_argument('--chart-credits', action='store_true',
+                               help='Also read .ssc chart credits (streams past the note data of every .ssc)')
+
+    scan = subparsers.add_parser('scan', help='Print every song as a JSON line')
+    add_library_args(scan)
+    scan.add_argument('--all-tags', action='store_true', help='Include every header tag')
+    scan.set_defaults(func=cmd_scan)
+
+    export = subparsers.add_parser('export', help='Write songs to CSV (same columns as the GUI export)')
+    add_library_args(export)
+    export.add_argument('-o', '--output', default='-', help="CSV file to write ('-' for stdout)")
+    export.set_defaults(func=cmd_export)
+
+    get = subparsers.add_parser('get', help='Print the header tags of simfiles')
+    get.add_argument('paths', nargs='+', help="Simfiles or folders; '-' reads paths from stdin")
+    get.add_argument('--field', action='append', help='Only print this tag (repeatable)')
+    get.set_defaults(func=cmd_get)
+
+    find = subparsers.add_parser('find', help='Print songs matching a filter')
+    add_library_args(find)
+    find.add_argument('--field', action='append', choices=SEARCH_FIELDS,
+                      help='Field to match (repeatable; default all of them)')
+    match = find.add_mutually_exclusive_group()
+    match.add_argument('--contains', help='Substring to look for')
+    match.add_argument('--equals', help='Exact value to look for')
+    match.add_argument('--regex', help='Regular expression to search for')
+    match.add_argument('--empty', action='store_true', help='Match songs where the field is empty')
+    find.add_argument('--case-sensitive', action='store_true')
+    find.add_argument('--paths', action='store_true', help='Print matching simfile paths only, one per line')
+    find.add_argument('--all-tags', action='store_true', help='Include every header tag')
+    find.set_defaults(func=cmd_find)
+
+    set_field = subparsers.add_parser('set-field', help='Set a header tag in simfiles')
+    set_field.add_argument('field', help=f"Tag name, one of {', '.join(SET_FIELD_TAGS)}")
+    set_field.add_argument('value')
+    set_field.add_argument('paths', nargs='+', help="Simfiles or folders; '-' reads paths from stdin")
+    set_field.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    set_field.add_argument('--allow-unknown', action='store_true', help='Allow setting a tag not in that list')
+    set_field.set_defaults(func=cmd_set_field)
+
+    set_credit = subparsers.add_parser('set-credit', help='Replace all song and chart credits in simfiles')
+    set_credit.add_argument('credit')
+    set_credit.add_argument('paths', nargs='+', help="Simfiles or folders; '-' reads paths from stdin")
+    set_credit.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    set_credit.set_defaults(func=cmd_set_credit)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workers < 1:
+        args.workers = 1
+
+    cache = None
+    if not args.no_cache:
+        cache = MetadataCache(args.cache_path) if args.cache_path else MetadataCache()
+        MetadataUtil.cache = cache
+
+    # Library code reports problems with print(); keep stdout for machine-readable records only
+    out = sys.stdout
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            count, failed = args.func(args, out)
+    except BrokenPipeError:
+        # Output piped into something like head that stopped reading; exit quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError, re.error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if cache:
+            cache.prune()
+            cache.close()
+
+    print(f"{args.command}: {count} done, {failed} failed in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sm_metadata_core import SongQuery, SongRecord
+
+
+def make_song(title, artist='', pack='Pack'):
+    return SongRecord(1, ['song.sm'], 'sm', pack, title, '', artist, '')
+
+
+def search_text(entry):
+    # Same fields, joined and casefolded, as the GUI's search index
+    return ' '.join((entry.pack, entry.title, entry.subtitle, entry.artist, entry.genre) + entry.credits).casefold()
+
+
+def matches(text, entry):
+    return SongQuery(text).matches(entry, search_text(entry))
+
+
+class SongQueryTest(unittest.TestCase):
+    def test_words_must_all_match_in_any_order(self):
+        query = SongQuery('Song 2')
+        self.assertIsNone(query.plain)
+        self.assertTrue(matches('Song 2', make_song('2 Fast Song')))
+        self.assertFalse(matches('Song 2', make_song('Another Song')))
+
+    def test_single_word_is_plain(self):
+        self.assertEqual(SongQuery('Song').plain, 'song')
+        self.assertIsNone(SongQuery('"Song 2"').plain)
+        self.assertIsNone(SongQuery('artist:camellia').plain)
+
+    def test_dangling_or_keeps_the_remaining_term(self):
+        query = SongQuery('fast OR')
+        self.assertEqual(query.plain, 'fast')
+        self.assertTrue(matches('fast OR', make_song('2 Fast Song')))
+
+
+if __name__ == '__main__':
+    unittest.main()